@@ -0,0 +1,223 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from backends import SharedTTLCache, RateLimiter
+from metrics import stage
+
+ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs")
+ADZUNA_COUNTRY = os.getenv("ADZUNA_COUNTRY", "us")
+ADZUNA_TIMEOUT_SECONDS = float(os.getenv("ADZUNA_TIMEOUT_SECONDS", 10))
+ADZUNA_MAX_RETRIES = int(os.getenv("ADZUNA_MAX_RETRIES", 3))
+ADZUNA_BACKOFF_SECONDS = float(os.getenv("ADZUNA_BACKOFF_SECONDS", 0.5))
+ADZUNA_POOL_SIZE = int(os.getenv("ADZUNA_POOL_SIZE", 10))
+ADZUNA_CACHE_TTL_SECONDS = int(os.getenv("ADZUNA_CACHE_TTL_SECONDS", 900))
+ADZUNA_PAGE_CONCURRENCY = int(os.getenv("ADZUNA_PAGE_CONCURRENCY", 4))
+# Upper bounds for one streamed search, so a single request cannot fan out without limit
+ADZUNA_MAX_PAGE_CONCURRENCY = int(os.getenv("ADZUNA_MAX_PAGE_CONCURRENCY", 8))
+ADZUNA_STREAM_MAX_RESULTS = int(os.getenv("ADZUNA_STREAM_MAX_RESULTS", 1000))
+# Requests per minute across all workers; 0 leaves them unthrottled
+ADZUNA_REQUESTS_PER_MINUTE = float(os.getenv("ADZUNA_REQUESTS_PER_MINUTE", 0))
+# Adzuna rejects larger pages
+ADZUNA_MAX_PAGE_SIZE = 50
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AdzunaError(Exception):
+    """Raised when Adzuna cannot be reached or keeps answering with an error."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def result_key(result):
+    """Identity of a raw Adzuna result for de-duplication across pages."""
+    return result.get("id") or result.get("redirect_url")
+
+
+def _retry_delay(attempt, retry_after=None, max_delay=None):
+    """Exponential back-off, honouring a numeric Retry-After header when given.
+
+    A Retry-After longer than `max_delay` is cut to it, so a server asking for
+    an hour cannot hold a request (and its worker thread) that long.
+    """
+    delay = ADZUNA_BACKOFF_SECONDS * (2 ** attempt)
+    if retry_after:
+        try:
+            requested = float(retry_after)
+        except ValueError:
+            requested = None
+        if requested is not None and math.isfinite(requested):
+            delay = max(requested, 0.0)
+    return delay if max_delay is None else min(delay, max_delay)
+
+
+class AdzunaClient:
+    """Adzuna search client with pooled connections, retries, a shared rate
+    limit and a TTL cache shared by all workers.
+
+    The sync session serves request handlers and crew tools; the async client
+    is created on first use by coroutine callers.
+    """
+
+    def __init__(self, base_url=ADZUNA_BASE_URL, country=ADZUNA_COUNTRY, timeout=ADZUNA_TIMEOUT_SECONDS,
+                 max_retries=ADZUNA_MAX_RETRIES, cache_ttl=ADZUNA_CACHE_TTL_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.country = country
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # Longest wait between attempts: the last exponential back-off step
+        self.max_retry_delay = ADZUNA_BACKOFF_SECONDS * (2 ** max_retries)
+        self.cache = SharedTTLCache("adzuna", cache_ttl)
+        self.limiter = RateLimiter("adzuna", ADZUNA_REQUESTS_PER_MINUTE)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=ADZUNA_POOL_SIZE, pool_maxsize=ADZUNA_POOL_SIZE)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._async_client = None
+        self._async_lock = threading.Lock()
+
+    def _request_args(self, role, location, page, results_per_page, country):
+        url = f"{self.base_url}/{country or self.country}/search/{page}"
+        # Credentials are read per request so a late load_dotenv() still applies
+        params = {
+            "app_id": os.getenv("ADZUNA_APP_ID"),
+            "app_key": os.getenv("ADZUNA_APP_KEY"),
+            "results_per_page": results_per_page,
+            "what": role,
+            "where": location,
+            "content-type": "application/json",
+        }
+        return url, params
+
+    def _cache_key(self, role, location, page, results_per_page, country):
+        return (role.strip().lower(), location.strip().lower(), page, results_per_page, country or self.country)
+
+    def search_page(self, role, location, page=1, results_per_page=10, country=None):
+        """Return the decoded JSON body of one search results page."""
+        key = self._cache_key(role, location, page, results_per_page, country)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        with stage("adzuna", page=page):
+            url, params = self._request_args(role, location, page, results_per_page, country)
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                self.limiter.acquire()
+                try:
+                    response = self._session.get(url, params=params, timeout=self.timeout)
+                except requests.exceptions.RequestException as e:
+                    if last_attempt:
+                        raise AdzunaError(f"Adzuna request failed: {e}") from e
+                    time.sleep(_retry_delay(attempt))
+                    continue
+                if response.status_code in RETRY_STATUSES and not last_attempt:
+                    time.sleep(_retry_delay(attempt, response.headers.get("Retry-After"), self.max_retry_delay))
+                    continue
+                if response.status_code >= 400:
+                    raise AdzunaError(f"Adzuna returned HTTP {response.status_code}", response.status_code)
+                payload = response.json()
+                self.cache.set(key, payload)
+                return payload
+
+    def _get_async_client(self):
+        with self._async_lock:
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=ADZUNA_POOL_SIZE, max_keepalive_connections=ADZUNA_POOL_SIZE),
+                )
+            return self._async_client
+
+    async def search_page_async(self, role, location, page=1, results_per_page=10, country=None):
+        """Async variant of `search_page`, sharing the same cache."""
+        key = self._cache_key(role, location, page, results_per_page, country)
+        cached = await self.cache.get_async(key)
+        if cached is not None:
+            return cached
+
+        client = self._get_async_client()
+        with stage("adzuna", page=page):
+            url, params = self._request_args(role, location, page, results_per_page, country)
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                await self.limiter.acquire_async()
+                try:
+                    response = await client.get(url, params=params)
+                except httpx.HTTPError as e:
+                    if last_attempt:
+                        raise AdzunaError(f"Adzuna request failed: {e}") from e
+                    await asyncio.sleep(_retry_delay(attempt))
+                    continue
+                if response.status_code in RETRY_STATUSES and not last_attempt:
+                    await asyncio.sleep(_retry_delay(attempt, response.headers.get("Retry-After"), self.max_retry_delay))
+                    continue
+                if response.status_code >= 400:
+                    raise AdzunaError(f"Adzuna returned HTTP {response.status_code}", response.status_code)
+                payload = response.json()
+                await self.cache.set_async(key, payload)
+                return payload
+
+    async def iter_results(self, role, location, max_results, page_size=ADZUNA_MAX_PAGE_SIZE,
+                           concurrency=ADZUNA_PAGE_CONCURRENCY, country=None):
+        """Async iterator over raw results from as many pages as `max_results` needs.
+
+        The first page tells how many results exist; the remaining pages are
+        fetched with at most `concurrency` requests in flight and yielded in
+        page order, skipping results already seen on an earlier page.
+        """
+        page_size = max(1, min(page_size, ADZUNA_MAX_PAGE_SIZE))
+        concurrency = max(1, min(concurrency, ADZUNA_MAX_PAGE_CONCURRENCY))
+        first = await self.search_page_async(role, location, 1, page_size, country)
+        available = min(max_results, first.get("count", 0) or 0)
+        last_page = max(1, math.ceil(available / page_size))
+
+        seen = set()
+        yielded = 0
+        pending = deque()
+        next_page = 2
+        payload = first
+        try:
+            while True:
+                for result in payload.get("results", []):
+                    key = result_key(result)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    yield result
+                    yielded += 1
+                    if yielded >= max_results:
+                        return
+                while next_page <= last_page and len(pending) < concurrency:
+                    pending.append(asyncio.ensure_future(
+                        self.search_page_async(role, location, next_page, page_size, country)
+                    ))
+                    next_page += 1
+                if not pending:
+                    return
+                payload = await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self):
+        self._session.close()
+
+    async def aclose(self):
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+adzuna_client = AdzunaClient()
@@ -1,63 +1,130 @@
 # agents.py
-import os
 import json
-import requests
+import os
+import threading
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from langchain_openai import ChatOpenAI
-from langchain.tools import tool
-from langchain.prompts import SystemMessagePromptTemplate, ChatPromptTemplate
+from adzuna import adzuna_client, AdzunaError, ADZUNA_PAGE_CONCURRENCY
+from job_store import job_store, DEFAULT_USER
 
 # Load environment variables
 load_dotenv()
 
 
-class JobSearchTools:
-    @tool("Job Search Tool")
-    def search_jobs(input_json: str) -> str:
-        """Search for job listings using the Adzuna API."""
-        try:
-            input_data = json.loads(input_json)
-            role, location, num_results = input_data['role'], input_data['location'], input_data.get('num_results', 5)
-        except (json.JSONDecodeError, KeyError):
-            return "Error: Invalid input format. Expected: {'role': '...', 'location': '...', 'num_results': ...}"
-
-        url = f"http://api.adzuna.com/v1/api/jobs/us/search/1?app_id={os.getenv('ADZUNA_APP_ID')}&app_key={os.getenv('ADZUNA_APP_KEY')}&results_per_page={num_results}&what={role}&where={location}&content-type=application/json"
-        
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            jobs = [{
-                "Role": job.get("title", "N/A"),
-                "Company": job.get("company", {}).get("display_name", "N/A"),
-                "Location": job.get("location", {}).get("display_name", "N/A"),
-                "Link": job.get("redirect_url", "#"),
-                "Description": job.get("description", "No description available.")
-            } for job in response.json().get('results', [])[:num_results]]
-            
-            save_results_to_file(jobs)
-            return json.dumps(jobs, indent=4) if jobs else "No jobs found."
-        except requests.exceptions.RequestException:
-            return "Error fetching jobs."
-
-def save_results_to_file(job_list):
-    """Save job results as JSON in a file instead of plain text."""
-    with open("task_output.txt", "w") as file:
-        json.dump(job_list, file, indent=4)  
-
-
-# Save a job to favorites
-def save_job(job):
-    with open("saved_jobs.json", "w") as file:
-        json.dump(job, file, indent=4)
-
-# Load saved job
-def get_saved_job():
+def map_adzuna_job(job):
+    """Map an Adzuna result to the job fields used throughout the app."""
+    return {
+        "Id": job.get("id"),
+        "Role": job.get("title", "N/A"),
+        "Company": job.get("company", {}).get("display_name", "N/A"),
+        "Location": job.get("location", {}).get("display_name", "N/A"),
+        "Link": job.get("redirect_url", "#"),
+        "Description": job.get("description", "No description available.")
+    }
+
+def fetch_jobs_page(role, location, num_results=5, page=1):
+    """Query one page of the Adzuna API directly.
+
+    Returns the mapped job list and the total number of matching jobs.
+    Raises AdzunaError if the API call fails.
+    """
+    payload = adzuna_client.search_page(role, location, page=page, results_per_page=num_results)
+    jobs = [map_adzuna_job(job) for job in payload.get('results', [])[:num_results]]
+    return jobs, payload.get('count', len(jobs))
+
+def fetch_jobs(role, location, num_results=5):
+    """Query the Adzuna API directly and return the mapped job list."""
+    return fetch_jobs_page(role, location, num_results)[0]
+
+async def iter_jobs(role, location, max_results, concurrency=ADZUNA_PAGE_CONCURRENCY):
+    """Async iterator over mapped jobs from many Adzuna pages, fetched concurrently."""
+    async for result in adzuna_client.iter_results(role, location, max_results, concurrency=concurrency):
+        yield map_adzuna_job(result)
+
+
+def search_jobs_tool(input_json: str) -> str:
+    """Search for job listings using the Adzuna API."""
+    try:
+        input_data = json.loads(input_json)
+        role, location, num_results = input_data['role'], input_data['location'], input_data.get('num_results', 5)
+    except (json.JSONDecodeError, KeyError):
+        return "Error: Invalid input format. Expected: {'role': '...', 'location': '...', 'num_results': ...}"
+
     try:
-        with open("saved_jobs.json", "r") as file:
-            return json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return None
+        jobs = fetch_jobs(role, location, num_results)
+        return json.dumps(jobs, indent=4) if jobs else "No jobs found."
+    except AdzunaError as e:
+        return f"Error fetching jobs: {e}"
+
+def parse_job_list(output):
+    """Extract the JSON job list from the job search agent's final answer."""
+    text = output.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # The agent may wrap the list in prose or a code fence
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end <= start:
+            raise
+        return json.loads(text[start:end + 1])
+
+
+# Save a job to the user's favorites
+def save_job(job, user_id=DEFAULT_USER):
+    return job_store.save(job, user_id)
+
+# Load the user's most recently saved job
+def get_saved_job(user_id=DEFAULT_USER):
+    return job_store.latest(user_id)
+
+
+# Agents and LLM clients are built on first use rather than at import time, so
+# the API starts quickly (and without an OpenAI key) and crewai/langchain are
+# only imported once an endpoint actually needs an agent.
+DEFAULT_MODEL = "gpt-4-turbo-preview"
+# Step-by-step agent logging to the console; off by default since it costs I/O under load
+CREW_VERBOSE = os.getenv("CREW_VERBOSE", "0") == "1"
+
+_registry_lock = threading.RLock()
+_llms = {}
+_agents = {}
+_agent_builders = {}
+
+
+def get_llm(model=DEFAULT_MODEL, temperature=None):
+    """One shared crewai LLM per model configuration.
+
+    crewai sends every request through litellm, which keeps one OpenAI client
+    (and connection pool) per endpoint and key; passing it a ChatOpenAI would
+    only get it converted into a fresh LLM that never uses the client.
+    """
+    key = (model, temperature)
+    with _registry_lock:
+        if key not in _llms:
+            from crewai import LLM
+            _llms[key] = LLM(model=model, temperature=temperature)
+        return _llms[key]
+
+
+def register_agent(name):
+    def decorator(builder):
+        _agent_builders[name] = builder
+        return builder
+    return decorator
+
+
+def get_agent(name):
+    """Return the named agent, building it on first use."""
+    with _registry_lock:
+        if name not in _agents:
+            _agents[name] = _agent_builders[name]()
+        return _agents[name]
+
+
+def __getattr__(name):
+    # Keeps `from agents import job_researcher` working, built lazily
+    if name in _agent_builders:
+        return get_agent(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Define the simpler system message
@@ -78,47 +145,55 @@ Example response format:
 
 Now generate a response matching this structure."""
 
-system_message_prompt = SystemMessagePromptTemplate.from_template(system_template)
-
-# Create a chat prompt with only the system message
-chat_prompt = ChatPromptTemplate.from_messages([system_message_prompt])
-
-# Update your agent configuration
-job_searcher_agent = Agent(
-    role='Job Searcher',
-    goal='Identify and provide relevant job opportunities based on user input.',
-    backstory="An AI recruitment assistant that finds the best job listings based on role and location, leveraging real-time job data to optimize career searches.",
-    llm=ChatOpenAI(
-        model="gpt-4-turbo-preview"
-    ),
-    tools=[JobSearchTools().search_jobs],
-    prompt=chat_prompt
-)
-
-job_researcher = Agent(
-    role="Job Requirements Analyst",
-    goal="Research and compile comprehensive requirements and qualifications for specific job titles",
-    backstory="""You are an expert in job market analysis with extensive experience in identifying 
-    key qualifications, skills, and requirements for various positions across different industries. 
-    Your analysis is thorough and precise, focusing on both technical skills and soft skills required.""",
-    verbose=True,
-    allow_delegation=False,
-    llm=ChatOpenAI(
-        model="gpt-4-turbo-preview",
-        temperature=0.7
+
+@register_agent("job_searcher_agent")
+def _build_job_searcher_agent():
+    from crewai import Agent
+    from langchain.tools import tool
+    from langchain.prompts import SystemMessagePromptTemplate, ChatPromptTemplate
+
+    system_message_prompt = SystemMessagePromptTemplate.from_template(system_template)
+
+    # Create a chat prompt with only the system message
+    chat_prompt = ChatPromptTemplate.from_messages([system_message_prompt])
+
+    return Agent(
+        role='Job Searcher',
+        goal='Identify and provide relevant job opportunities based on user input.',
+        backstory="An AI recruitment assistant that finds the best job listings based on role and location, leveraging real-time job data to optimize career searches.",
+        llm=get_llm(DEFAULT_MODEL),
+        tools=[tool("Job Search Tool")(search_jobs_tool)],
+        prompt=chat_prompt
     )
-)
-
-resume_evaluator = Agent(
-    role="Professional Resume Evaluator",
-    goal="Evaluate resumes against job requirements and provide detailed scoring and improvement suggestions",
-    backstory="""You are a senior hiring manager and resume expert with years of experience in 
-    evaluating candidates' resumes across multiple industries. You understand both ATS systems and 
-    human evaluation factors. You provide honest, constructive feedback to help candidates improve.""",
-    verbose=True,
-    allow_delegation=False,
-    llm=ChatOpenAI(
-        model="gpt-4-turbo-preview",
-        temperature=0.7
+
+
+@register_agent("job_researcher")
+def _build_job_researcher():
+    from crewai import Agent
+
+    return Agent(
+        role="Job Requirements Analyst",
+        goal="Research and compile comprehensive requirements and qualifications for specific job titles",
+        backstory="""You are an expert in job market analysis with extensive experience in identifying 
+        key qualifications, skills, and requirements for various positions across different industries. 
+        Your analysis is thorough and precise, focusing on both technical skills and soft skills required.""",
+        verbose=CREW_VERBOSE,
+        allow_delegation=False,
+        llm=get_llm(DEFAULT_MODEL, temperature=0.7)
+    )
+
+
+@register_agent("resume_evaluator")
+def _build_resume_evaluator():
+    from crewai import Agent
+
+    return Agent(
+        role="Professional Resume Evaluator",
+        goal="Evaluate resumes against job requirements and provide detailed scoring and improvement suggestions",
+        backstory="""You are a senior hiring manager and resume expert with years of experience in 
+        evaluating candidates' resumes across multiple industries. You understand both ATS systems and 
+        human evaluation factors. You provide honest, constructive feedback to help candidates improve.""",
+        verbose=CREW_VERBOSE,
+        allow_delegation=False,
+        llm=get_llm(DEFAULT_MODEL, temperature=0.7)
     )
-)
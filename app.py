@@ -1,122 +1,592 @@
 # app.py
-import os
+import argparse
 import json
-import requests
-from dotenv import load_dotenv
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
-from langchain.tools import tool
-from langchain.prompts import PromptTemplate
-from fastapi import FastAPI, HTTPException
+import os
+from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from starlette.concurrency import iterate_in_threadpool
 from pydantic import BaseModel
+from typing import List, Optional
 import uvicorn
-from agents import save_job, get_saved_job, job_researcher, resume_evaluator
-from tasks import job_search_task, jd_research_task, evaluation_task
+import asyncio
+import base64
+from agents import save_job, get_saved_job, fetch_jobs_page, iter_jobs, parse_job_list
+from job_store import job_store, DEFAULT_USER
+from adzuna import (
+    adzuna_client, AdzunaError, ADZUNA_MAX_PAGE_SIZE, ADZUNA_PAGE_CONCURRENCY, ADZUNA_STREAM_MAX_RESULTS
+)
+from tasks import job_search_task
+from pipeline import (
+    llm_cache, requirements_store, get_job_requirements, evaluate_against_requirements, stream_evaluation,
+    register_jobs, prefetch_requirements, run_in_crew_executor, compact_resume_for_evaluation,
+    match_resume_skills, skill_check_for, skill_index, PREFETCH_SEARCH_REQUIREMENTS, CREW_TIMEOUT_SECONDS
+)
+from batch import evaluate_batch, BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_RESUMES
+from evaluation_queue import evaluation_queue, QueueDraining, SHUTDOWN_DRAIN_SECONDS
+from matrix import evaluate_matrix, MATRIX_DEFAULT_CONCURRENCY, MATRIX_MAX_CELLS, MATRIX_MIN_FIT
+from incremental import evaluate_incremental, resume_sections
+from metrics import render_metrics
+from ranking import rank_jobs
+from resumes import resume_store
+from reports import EvaluationReport, render_markdown
+from requirements_store import job_fingerprint
 
 app = FastAPI()
 
 class SaveJobRequest(BaseModel):
     job: dict
+    user_id: str = DEFAULT_USER
 
 @app.post("/save_job")
 def save_favorite_job(request: SaveJobRequest):
-    save_job(request.job)
-    return {"message": "Job saved successfully!"}
+    job_id = save_job(request.job, request.user_id)
+    # Research the job's requirements now so the first evaluation can reuse them
+    prefetch_requirements(request.job)
+    return {"message": "Job saved successfully!", "job_id": job_id}
 
 @app.get("/get_saved_job")
-def fetch_saved_job():
-    job = get_saved_job()
+def fetch_saved_job(user_id: str = DEFAULT_USER):
+    job = get_saved_job(user_id)
     if not job:
         raise HTTPException(status_code=404, detail="No saved job found.")
     return job
 
 @app.get("/get_saved_job_description")
-def fetch_saved_job_description():
-    job = get_saved_job()
+def fetch_saved_job_description(user_id: str = DEFAULT_USER):
+    job = get_saved_job(user_id)
     if not job:
         raise HTTPException(status_code=404, detail="No saved job found.")
     return {"Role": job["Role"], "Company": job["Company"], "Description": job["Description"]}
 
+@app.get("/saved_jobs")
+def list_saved_jobs(user_id: str = DEFAULT_USER, company: Optional[str] = None):
+    return {"results": job_store.list(user_id, company)}
+
+@app.get("/saved_jobs/{job_id}")
+def fetch_saved_job_by_id(job_id: str, user_id: str = DEFAULT_USER):
+    job = job_store.get(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No saved job found.")
+    return job
+
+@app.delete("/saved_jobs/{job_id}")
+def delete_saved_job(job_id: str, user_id: str = DEFAULT_USER):
+    if not job_store.delete(job_id, user_id):
+        raise HTTPException(status_code=404, detail="No saved job found.")
+    return {"message": "Job removed."}
+
 class JobSearchRequest(BaseModel):
     role: str
     location: str
     num_results: int = 5
+    use_agent: bool = False
+    cursor: Optional[str] = None
+
+class JobStreamRequest(BaseModel):
+    role: str
+    location: str
+    max_results: int = 500
+    concurrency: int = ADZUNA_PAGE_CONCURRENCY
+
+def _encode_cursor(page):
+    return base64.urlsafe_b64encode(json.dumps({"page": page}).encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["page"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+def _search_jobs_with_agent(request: JobSearchRequest):
+    from crewai import Crew
+
+    task = job_search_task(request.role, request.location, request.num_results)
+    output = Crew(tasks=[task]).kickoff()
+    # The job list comes back in the crew output, never through a shared file
+    results = getattr(output, 'raw', str(output))
+    try:
+        job_list = parse_job_list(results)
+    except json.JSONDecodeError:
+        print("DEBUG: Raw CrewAI Output ->", results)  
+        raise HTTPException(status_code=500, detail="Invalid JSON format from CrewAI.")
+    if not isinstance(job_list, list):  
+        raise ValueError("CrewAI returned an invalid format (not a list).")
+    return job_list
 
 @app.post("/search_jobs")
 def search_jobs(request: JobSearchRequest):
+    page = _decode_cursor(request.cursor) if request.cursor else 1
+    page_size = max(1, min(request.num_results, ADZUNA_MAX_PAGE_SIZE))
+    next_cursor = None
     try:
-        task = job_search_task(request.role, request.location, request.num_results)
-        Crew(tasks=[task]).kickoff()
-        with open("task_output.txt", "r") as file:
-            results = file.read()
-        try:
-            job_list = json.loads(results.strip())  
-            if isinstance(job_list, list):  
-                return {"results": job_list}
-            else:
-                raise ValueError("CrewAI returned an invalid format (not a list).")
-        except json.JSONDecodeError:
-            print("DEBUG: Raw CrewAI Output ->", results)  
-            raise HTTPException(status_code=500, detail="Invalid JSON format from CrewAI.")
-
+        if request.use_agent:
+            job_list = _search_jobs_with_agent(request)
+        else:
+            # Plain Adzuna query and field mapping, no LLM round trip
+            job_list, total = fetch_jobs_page(request.role, request.location, page_size, page)
+            if page * page_size < total:
+                next_cursor = _encode_cursor(page + 1)
+    except AdzunaError as e:
+        raise HTTPException(status_code=502, detail=f"Error fetching jobs from Adzuna: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    register_jobs(job_list)
+    if PREFETCH_SEARCH_REQUIREMENTS:
+        for job in job_list:
+            prefetch_requirements(job)
+    return {"results": job_list, "next_cursor": next_cursor}
+
+async def _job_lines(request: JobStreamRequest):
+    batch = []
+    try:
+        async for job in iter_jobs(request.role, request.location, request.max_results, request.concurrency):
+            batch.append(job)
+            yield json.dumps(job) + "\n"
+            if len(batch) >= ADZUNA_MAX_PAGE_SIZE:
+                register_jobs(batch)
+                batch = []
+    except AdzunaError as e:
+        yield json.dumps({"error": f"Error fetching jobs from Adzuna: {str(e)}"}) + "\n"
+    register_jobs(batch)
+
+@app.post("/search_jobs/stream")
+async def stream_search_jobs(request: JobStreamRequest):
+    """Newline-delimited JSON, one job per line, fetched from many Adzuna pages concurrently.
+
+    `concurrency` is clamped to ADZUNA_MAX_PAGE_CONCURRENCY.
+    """
+    if not 1 <= request.max_results <= ADZUNA_STREAM_MAX_RESULTS:
+        raise HTTPException(
+            status_code=400, detail=f"max_results must be between 1 and {ADZUNA_STREAM_MAX_RESULTS}."
+        )
+    return StreamingResponse(_job_lines(request), media_type="application/x-ndjson")
+
+
+@app.post("/resumes")
+async def upload_resume(file: UploadFile = File(...)):
+    """Parse an uploaded PDF resume and return an id usable in place of `resume_text`."""
+    data = await file.read()
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty upload.")
+    loop = asyncio.get_running_loop()
+    try:
+        resume, cached = await loop.run_in_executor(None, resume_store.ingest, data, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "resume_id": resume["resume_id"],
+        "page_count": resume["page_count"],
+        "characters": len(resume["text"]),
+        "cached": cached
+    }
+
+@app.get("/resumes/{resume_id}")
+def fetch_resume(resume_id: str):
+    resume = resume_store.get(resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="No resume found.")
+    return resume
+
+@app.delete("/resumes/{resume_id}")
+def delete_resume(resume_id: str):
+    if not resume_store.delete(resume_id):
+        raise HTTPException(status_code=404, detail="No resume found.")
+    return {"message": "Resume removed."}
 
+def _resolve_resume_text(resume_text: Optional[str], resume_id: Optional[str]):
+    """Resume text from the request body, or from an earlier /resumes upload."""
+    if resume_text:
+        return resume_text
+    if not resume_id:
+        raise HTTPException(status_code=400, detail="Provide either resume_text or resume_id.")
+    text = resume_store.get_text(resume_id)
+    if text is None:
+        raise HTTPException(status_code=404, detail=f"No resume found for id {resume_id}.")
+    return text
 
 class ResumeEvaluationRequest(BaseModel):
     job_title: str
     job_des: str
-    resume_text: str
+    resume_text: Optional[str] = None
+    resume_id: Optional[str] = None
+    job_link: Optional[str] = None
+    use_cache: bool = True
+    timeout_seconds: Optional[float] = None
 
 class ResumeEvaluationResponse(BaseModel):
     job_requirements: str
     evaluation_result: str
+    report: EvaluationReport
+    tokens_saved: int = 0
 
 @app.post("/evaluate", response_model=ResumeEvaluationResponse)
 async def evaluate_resume(request: ResumeEvaluationRequest):
+    # Per-request timeout for each crew, never above the server-wide limit
+    timeout = min(request.timeout_seconds or CREW_TIMEOUT_SECONDS, CREW_TIMEOUT_SECONDS)
+    resume_text = _resolve_resume_text(request.resume_text, request.resume_id)
     try:        
-        # Create and run research task
-        research_task = jd_research_task(request.job_title, request.job_des)
-        research_crew = Crew(
-            agents=[job_researcher],
-            tasks=[research_task],
-            verbose=True,
-            process=Process.sequential
+        # Look up the job's requirements report, researching it only on first use
+        job_requirements = await run_in_crew_executor(
+            get_job_requirements,
+            request.job_title, request.job_des, request.job_link, request.use_cache,
+            timeout=timeout
         )
-
-        job_requirements_output = research_crew.kickoff()
-
-
-        # Extract the string from the CrewOutput object
-        if hasattr(job_requirements_output, 'raw'):
-            job_requirements = job_requirements_output.raw
-        else:
-            # For older versions or if the structure is different
-            job_requirements = str(job_requirements_output)
         
-        print('evaluation crew')
-        # Create and run evaluation task
-        eval_task = evaluation_task(job_requirements, request.resume_text)
-        evaluation_crew = Crew(
-            agents=[resume_evaluator],
-            tasks=[eval_task],
-            verbose=True,
-            process=Process.sequential
+        # Check skills against the full resume, then strip extraction noise and
+        # fit the resume into the prompt token budget
+        skill_check = skill_check_for(job_requirements, resume_text)
+        resume_text, compaction = compact_resume_for_evaluation(job_requirements, resume_text, skill_check=skill_check)
+        
+        # Run evaluation task
+        report = await run_in_crew_executor(
+            evaluate_against_requirements,
+            job_requirements, resume_text, request.use_cache, skill_check,
+            timeout=timeout
         )
-
-        evaluation_output = evaluation_crew.kickoff()
-        evaluation_result = getattr(evaluation_output, 'raw', str(evaluation_output))
         
         return ResumeEvaluationResponse(
             job_requirements=job_requirements,
-            evaluation_result=evaluation_result
+            evaluation_result=render_markdown(report),
+            report=report,
+            tokens_saved=compaction["tokens_saved"]
         )
     
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Evaluation timed out after {timeout:g} seconds.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _evaluation_events(request: ResumeEvaluationRequest, resume_text: str):
+    timeout = min(request.timeout_seconds or CREW_TIMEOUT_SECONDS, CREW_TIMEOUT_SECONDS)
+    try:
+        job_requirements = await run_in_crew_executor(
+            get_job_requirements,
+            request.job_title, request.job_des, request.job_link, request.use_cache,
+            timeout=timeout
+        )
+        yield _sse("requirements", {"text": job_requirements})
+
+        skill_check = skill_check_for(job_requirements, resume_text)
+        resume_text, compaction = compact_resume_for_evaluation(
+            job_requirements, resume_text, skill_check=skill_check, streamed=True
+        )
+        tokens = stream_evaluation(job_requirements, resume_text, request.use_cache, skill_check)
+        async for token in iterate_in_threadpool(tokens):
+            yield _sse("token", {"text": token})
+        yield _sse("done", {"tokens_saved": compaction["tokens_saved"]})
+    except asyncio.TimeoutError:
+        yield _sse("error", {"detail": f"Research timed out after {timeout:g} seconds."})
+    except Exception as e:
+        yield _sse("error", {"detail": f"Error processing request: {str(e)}"})
+
+@app.post("/evaluate/stream")
+async def evaluate_resume_stream(request: ResumeEvaluationRequest):
+    """Server-sent events: `requirements` once research is done, then `token`
+    events with the evaluation text, then `done` (or `error`)."""
+    resume_text = _resolve_resume_text(request.resume_text, request.resume_id)
+    return StreamingResponse(
+        _evaluation_events(request, resume_text),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class IncrementalEvaluationRequest(ResumeEvaluationRequest):
+    user_id: str = DEFAULT_USER
+
+class IncrementalSection(BaseModel):
+    heading: str
+    hash: str
+    change: str
+    reevaluated: bool
+    score: float
+
+class IncrementalEvaluationResponse(BaseModel):
+    job_requirements: str
+    version: int
+    previous_version: Optional[int] = None
+    previous_overall_score: Optional[float] = None
+    report: EvaluationReport
+    evaluation_result: str
+    sections: List[IncrementalSection]
+    removed_sections: List[str]
+    sections_reevaluated: int
+    sections_reused: int
+
+@app.post("/evaluate/incremental", response_model=IncrementalEvaluationResponse)
+async def evaluate_resume_incremental(request: IncrementalEvaluationRequest):
+    """Section-by-section evaluation for resume iteration: only sections whose
+    content changed since an earlier evaluation against this job go to the LLM."""
+    timeout = min(request.timeout_seconds or CREW_TIMEOUT_SECONDS, CREW_TIMEOUT_SECONDS)
+    resume_text = _resolve_resume_text(request.resume_text, request.resume_id)
+    if not resume_sections(resume_text):
+        raise HTTPException(status_code=400, detail="The resume has no text to evaluate.")
+    try:
+        result = await run_in_crew_executor(
+            evaluate_incremental,
+            request.job_title, request.job_des, resume_text, request.job_link, request.user_id, request.use_cache,
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Evaluation timed out after {timeout:g} seconds.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    return IncrementalEvaluationResponse(**result)
+
+class EvaluationJobResponse(BaseModel):
+    id: str
+    status: str
+    job_requirements: Optional[str] = None
+    evaluation_result: Optional[str] = None
+    report: Optional[EvaluationReport] = None
+    tokens_saved: int = 0
+    error: Optional[str] = None
+
+@app.post("/evaluations", response_model=EvaluationJobResponse, status_code=202)
+def submit_evaluation(request: ResumeEvaluationRequest):
+    """Queue an evaluation and return its id immediately; poll `GET /evaluations/{id}`."""
+    resume_text = _resolve_resume_text(request.resume_text, request.resume_id)
+    try:
+        evaluation_id = evaluation_queue.submit(
+            request.job_title, request.job_des, resume_text, request.job_link, request.use_cache
+        )
+    except QueueDraining as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return EvaluationJobResponse(**evaluation_queue.get(evaluation_id))
+
+@app.get("/evaluations/{evaluation_id}", response_model=EvaluationJobResponse)
+def fetch_evaluation(evaluation_id: str):
+    """Status is `queued`, `researching`, `evaluating`, `completed` or `failed`;
+    `job_requirements` is filled in as soon as research is done."""
+    job = evaluation_queue.get(evaluation_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No evaluation found (it may have expired).")
+    return EvaluationJobResponse(**job)
+
+class BatchResume(BaseModel):
+    candidate_id: str
+    resume_text: Optional[str] = None
+    resume_id: Optional[str] = None
+
+class BatchEvaluationRequest(BaseModel):
+    job_title: str
+    job_des: str
+    resumes: List[BatchResume]
+    job_link: Optional[str] = None
+    concurrency: int = BATCH_DEFAULT_CONCURRENCY
+    use_cache: bool = True
+
+class BatchEvaluationItem(BaseModel):
+    candidate_id: str
+    status: str
+    rank: Optional[int] = None
+    score: Optional[float] = None
+    tokens_saved: int = 0
+    evaluation_result: Optional[str] = None
+    report: Optional[EvaluationReport] = None
+    error: Optional[str] = None
+
+class BatchEvaluationResponse(BaseModel):
+    job_requirements: str
+    results: List[BatchEvaluationItem]
+
+@app.post("/evaluate/batch", response_model=BatchEvaluationResponse)
+def evaluate_resume_batch(request: BatchEvaluationRequest):
+    if not request.resumes:
+        raise HTTPException(status_code=400, detail="No resumes provided.")
+    if len(request.resumes) > BATCH_MAX_RESUMES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_RESUMES} resumes per batch.")
+    resumes = [
+        (resume.candidate_id, _resolve_resume_text(resume.resume_text, resume.resume_id))
+        for resume in request.resumes
+    ]
+    try:
+        # Research the job once and share the report across every resume
+        job_requirements = get_job_requirements(
+            request.job_title, request.job_des, request.job_link, request.use_cache
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error researching job requirements: {str(e)}")
+
+    results = evaluate_batch(
+        job_requirements,
+        resumes,
+        request.concurrency,
+        request.use_cache
+    )
+    return BatchEvaluationResponse(
+        job_requirements=job_requirements,
+        results=[BatchEvaluationItem(**result) for result in results]
+    )
+
+class MatrixEvaluationRequest(BaseModel):
+    resumes: List[BatchResume]
+    jobs: Optional[List[dict]] = None
+    job_ids: Optional[List[str]] = None
+    user_id: str = DEFAULT_USER
+    concurrency: int = MATRIX_DEFAULT_CONCURRENCY
+    min_fit: float = MATRIX_MIN_FIT
+    top_k: Optional[int] = None
+    use_cache: bool = True
+
+class MatrixCell(BaseModel):
+    candidate_id: str
+    job_id: str
+    fit_score: float
+    status: str
+    score: Optional[float] = None
+    matched: List[str] = []
+    missing: List[str] = []
+    summary: Optional[str] = None
+    error: Optional[str] = None
+
+class MatrixEvaluationResponse(BaseModel):
+    candidates: List[str]
+    jobs: List[dict]
+    scores: List[List[Optional[float]]]
+    cells: List[MatrixCell]
+
+def _matrix_jobs(request: MatrixEvaluationRequest):
+    if request.jobs is not None:
+        return request.jobs
+    if request.job_ids is None:
+        return job_store.list(request.user_id)
+    jobs = []
+    for job_id in request.job_ids:
+        job = job_store.get(job_id, request.user_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"No saved job found for id {job_id}.")
+        jobs.append(job)
+    return jobs
+
+@app.post("/evaluate/matrix", response_model=MatrixEvaluationResponse)
+def evaluate_resume_matrix(request: MatrixEvaluationRequest):
+    """Score M resumes against N jobs (given, by saved `job_ids`, or all the user's saved jobs).
+
+    Pairs below `min_fit` TF-IDF similarity (or outside each resume's `top_k`
+    best jobs) are returned as `pruned` without an LLM call.
+    """
+    jobs = _matrix_jobs(request)
+    if not request.resumes or not jobs:
+        raise HTTPException(status_code=400, detail="Provide at least one resume and one job.")
+    if len(request.resumes) * len(jobs) > MATRIX_MAX_CELLS:
+        raise HTTPException(status_code=400, detail=f"At most {MATRIX_MAX_CELLS} resume/job pairs per matrix.")
+    resumes = [
+        (resume.candidate_id, _resolve_resume_text(resume.resume_text, resume.resume_id))
+        for resume in request.resumes
+    ]
+    matrix = evaluate_matrix(
+        resumes, jobs, request.concurrency, request.min_fit, request.top_k, request.use_cache
+    )
+    return MatrixEvaluationResponse(**matrix)
+
+class SkillMatchRequest(BaseModel):
+    job_title: str = ""
+    job_des: str = ""
+    job_link: Optional[str] = None
+    resume_text: Optional[str] = None
+    resume_id: Optional[str] = None
+
+@app.post("/skills/match")
+def match_skills_for_resume(request: SkillMatchRequest):
+    """Deterministic skill coverage of a job by a resume, without any LLM call.
+
+    Skills come from the job description plus its requirements report when
+    one is already cached; nothing is researched here.
+    """
+    resume_text = _resolve_resume_text(request.resume_text, request.resume_id)
+    requirements = requirements_store.get(job_fingerprint(request.job_title, request.job_des, request.job_link))
+    job_text = "\n".join(filter(None, [request.job_title, request.job_des, requirements]))
+    if not job_text:
+        raise HTTPException(status_code=400, detail="Provide job_title and job_des.")
+    return {**match_resume_skills(resume_text, job_text), "requirements_cached": requirements is not None}
+
+class RankJobsRequest(BaseModel):
+    resume_text: Optional[str] = None
+    resume_id: Optional[str] = None
+    jobs: Optional[List[dict]] = None
+    user_id: str = DEFAULT_USER
+    top_k: Optional[int] = None
+    evaluate_top_k: bool = False
+    use_cache: bool = True
+
+async def _evaluate_job(job, resume_text, use_cache):
+    job_requirements = await run_in_crew_executor(
+        get_job_requirements,
+        job.get("Role", ""), job.get("Description", ""), job.get("Link"), use_cache
+    )
+    skill_check = skill_check_for(job_requirements, resume_text)
+    resume_text, _ = compact_resume_for_evaluation(job_requirements, resume_text, skill_check=skill_check)
+    return await run_in_crew_executor(
+        evaluate_against_requirements, job_requirements, resume_text, use_cache, skill_check
+    )
+
+@app.post("/rank_jobs")
+async def rank_jobs_for_resume(request: RankJobsRequest):
+    """Rank jobs (given, or the user's saved jobs) by local TF-IDF similarity to the resume.
+
+    With `evaluate_top_k`, only the `top_k` best-fitting jobs go on to the
+    evaluation crew.
+    """
+    resume_text = _resolve_resume_text(request.resume_text, request.resume_id)
+    jobs = request.jobs if request.jobs is not None else job_store.list(request.user_id)
+    ranked = rank_jobs(resume_text, jobs, request.top_k)
+    if request.evaluate_top_k:
+        if request.top_k is None:
+            raise HTTPException(status_code=400, detail="evaluate_top_k requires top_k.")
+        evaluations = await asyncio.gather(
+            *[_evaluate_job(job, resume_text, request.use_cache) for job in ranked],
+            return_exceptions=True
+        )
+        for job, evaluation in zip(ranked, evaluations):
+            if isinstance(evaluation, BaseException):
+                job["EvaluationError"] = str(evaluation) or type(evaluation).__name__
+            else:
+                job["Evaluation"] = render_markdown(evaluation)
+                job["EvaluationScore"] = evaluation.overall_score
+                job["EvaluationReport"] = evaluation.model_dump()
+    return {"results": ranked}
+
+@app.on_event("shutdown")
+async def close_clients():
+    # Uvicorn has already let in-flight requests finish; queued evaluations get
+    # the same grace period before they are marked failed
+    await asyncio.to_thread(evaluation_queue.drain, SHUTDOWN_DRAIN_SECONDS)
+    await adzuna_client.aclose()
+
+@app.get("/cache/stats")
+def fetch_cache_stats():
+    return {
+        **llm_cache.stats(),
+        "requirements": requirements_store.stats(),
+        "adzuna": adzuna_client.cache.stats(),
+        "skills": skill_index.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def fetch_metrics():
+    """Stage latency histograms and per-agent token/cost counters in Prometheus text format.
+
+    Counts cover this worker process only; run a single worker for complete totals.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
+    parser = argparse.ArgumentParser(description="Run the AI Career Guide API.")
+    parser.add_argument("--host", default=os.getenv("APP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("APP_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("APP_WORKERS", 0)),
+                        help="worker processes for production; 0 (default) runs one process with auto-reload")
+    args = parser.parse_args()
+    if args.workers:
+        uvicorn.run("app:app", host=args.host, port=args.port, workers=args.workers,
+                    timeout_graceful_shutdown=int(SHUTDOWN_DRAIN_SECONDS))
+    else:
+        uvicorn.run("app:app", host=args.host, port=args.port, reload=True)
 
@@ -0,0 +1,311 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from functools import lru_cache
+
+from metrics import rate_limit_wait
+
+# State shared by every worker process: queued evaluation results, the Adzuna
+# response cache and rate-limit buckets. "sqlite" or "redis" (any
+# Redis-compatible server); the job, resume, requirements and LLM stores are
+# local SQLite files either way, so all workers must run on one host.
+STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "state.db")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "career-guide:")
+# Expired SQLite rows are deleted once every this many writes
+_SQLITE_PURGE_EVERY = 256
+
+
+class SQLiteBackend:
+    """Key/value entries with TTL and token buckets in one SQLite file.
+
+    WAL mode lets every worker process on the host read and write it at once;
+    bucket updates run in an IMMEDIATE transaction so they are atomic across
+    processes.
+    """
+
+    def __init__(self, path=STATE_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS kv (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS token_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+
+    def get(self, namespace, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), now + ttl if ttl else None),
+            )
+            self._writes += 1
+            if self._writes % _SQLITE_PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def add(self, namespace, key, value, ttl=None):
+        """Set only if the key is absent or expired; True when it was set."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """INSERT INTO kv VALUES (?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?""",
+                (namespace, key, json.dumps(value), now + ttl if ttl else None, now),
+            )
+        return cursor.rowcount == 1
+
+    def delete(self, namespace, key, value=None):
+        """Delete the key; with `value`, only while it still holds that value."""
+        with self._lock:
+            if value is None:
+                self._conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+            else:
+                self._conn.execute(
+                    "DELETE FROM kv WHERE namespace = ? AND key = ? AND value = ?",
+                    (namespace, key, json.dumps(value)),
+                )
+
+    def take(self, bucket, rate, capacity, cost=1):
+        """Take `cost` tokens from a bucket refilled at `rate` per second up to
+        `capacity`. Returns 0 when taken, otherwise the seconds until there are
+        enough tokens (nothing is taken then)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (bucket,)
+                ).fetchone()
+                now = time.time()
+                tokens = capacity if row is None else min(capacity, row[0] + max(now - row[1], 0) * rate)
+                wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+                if not wait:
+                    tokens -= cost
+                self._conn.execute("INSERT OR REPLACE INTO token_buckets VALUES (?, ?, ?)", (bucket, tokens, now))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Same refill rule as SQLiteBackend.take, run atomically on the server with its clock
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated_at, 0) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+_DELETE_IF_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+
+class RedisBackend:
+    """The SQLiteBackend interface on a Redis-compatible server."""
+
+    def __init__(self, url=REDIS_URL, prefix=REDIS_KEY_PREFIX):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("STATE_BACKEND=redis needs the redis package: pip install redis") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._delete_if = self._client.register_script(_DELETE_IF_SCRIPT)
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}{namespace}:{key}"
+
+    def get(self, namespace, key):
+        value = self._client.get(self._key(namespace, key))
+        return None if value is None else json.loads(value)
+
+    def set(self, namespace, key, value, ttl=None):
+        self._client.set(self._key(namespace, key), json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def add(self, namespace, key, value, ttl=None):
+        return bool(self._client.set(
+            self._key(namespace, key), json.dumps(value), nx=True, px=int(ttl * 1000) if ttl else None
+        ))
+
+    def delete(self, namespace, key, value=None):
+        if value is None:
+            self._client.delete(self._key(namespace, key))
+        else:
+            self._delete_if(keys=[self._key(namespace, key)], args=[json.dumps(value)])
+
+    def take(self, bucket, rate, capacity, cost=1):
+        return float(self._take(keys=[self._key("bucket", bucket)], args=[rate, capacity, cost]))
+
+    def close(self):
+        self._client.close()
+
+
+@lru_cache(maxsize=None)
+def state_backend():
+    """The configured backend, opened on first use in each worker process."""
+    if STATE_BACKEND == "sqlite":
+        return SQLiteBackend()
+    if STATE_BACKEND == "redis":
+        return RedisBackend()
+    raise ValueError(f"Unknown STATE_BACKEND {STATE_BACKEND!r}; use 'sqlite' or 'redis'.")
+
+
+class SharedTTLCache:
+    """TTL cache in the state backend, so every worker sees the same entries.
+    Keys may be any JSON-serializable value."""
+
+    def __init__(self, namespace, ttl, backend=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._backend = backend
+
+    @property
+    def backend(self):
+        return self._backend or state_backend()
+
+    def get(self, key):
+        value = self.backend.get(self.namespace, json.dumps(key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(self.namespace, json.dumps(key), value, self.ttl)
+
+    # Backend calls can block (SQLite busy waits, network round trips), so
+    # coroutines run them on a thread instead of the event loop
+    async def get_async(self, key):
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key, value):
+        await asyncio.to_thread(self.set, key, value)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SharedLease:
+    """Named leases in the state backend: at most one worker holds a name until
+    it releases it or `ttl` seconds pass, so a crashed worker cannot keep it."""
+
+    def __init__(self, namespace, ttl, backend=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._backend = backend
+
+    @property
+    def backend(self):
+        return self._backend or state_backend()
+
+    def acquire(self, name):
+        """A token to release the lease with, or None if another holder has it."""
+        token = uuid.uuid4().hex
+        return token if self.backend.add(self.namespace, name, token, self.ttl) else None
+
+    def release(self, name, token):
+        self.backend.delete(self.namespace, name, token)
+
+
+class RateLimiter:
+    """Token bucket kept in the state backend, so all workers share one limit.
+
+    Allows `per_minute` acquisitions on average and bursts of up to ten
+    seconds' worth; a limit of 0 disables it.
+    """
+
+    def __init__(self, name, per_minute, backend=None):
+        self.name = name
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * 10)
+        self._backend = backend
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def _take(self, cost):
+        backend = self._backend or state_backend()
+        return backend.take(self.name, self.rate, self.capacity, min(cost, self.capacity))
+
+    def acquire(self, cost=1):
+        """Block until `cost` tokens are taken; returns the seconds waited."""
+        waited = 0.0
+        while self.enabled:
+            wait = self._take(cost)
+            if not wait:
+                break
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            rate_limit_wait.inc(waited, limiter=self.name)
+        return waited
+
+    async def acquire_async(self, cost=1):
+        """`acquire` for coroutines; neither the backend call nor the wait blocks the event loop."""
+        waited = 0.0
+        while self.enabled:
+            wait = await asyncio.to_thread(self._take, cost)
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        if waited:
+            rate_limit_wait.inc(waited, limiter=self.name)
+        return waited
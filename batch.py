@@ -0,0 +1,102 @@
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import evaluate_against_requirements, compact_resume_for_evaluation, skill_check_for, CREW_MAX_CONCURRENCY
+from reports import render_markdown
+
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", 4))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 16))
+BATCH_MAX_RESUMES = int(os.getenv("BATCH_MAX_RESUMES", 500))
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", 4))
+RATE_LIMIT_BASE_DELAY = float(os.getenv("RATE_LIMIT_BASE_DELAY", 2.0))
+
+
+def is_rate_limit_error(exc):
+    """Whether an exception raised by a crew run came from an LLM rate limit."""
+    message = str(exc).lower()
+    return "ratelimit" in type(exc).__name__.lower() or "rate limit" in message or "429" in message
+
+
+def parse_overall_score(evaluation):
+    """Pull the 'Overall Score (out of 10)' value from an evaluation report."""
+    text = re.sub(r"\(\s*out of 10\s*\)", "", evaluation or "", flags=re.IGNORECASE)
+    match = re.search(r"overall score\W{0,20}(\d+(?:\.\d+)?)", text, flags=re.IGNORECASE)
+    if match is None:
+        match = re.search(r"(\d+(?:\.\d+)?)\s*/\s*10\b", text)
+    if match is None:
+        return None
+    return min(max(float(match.group(1)), 0.0), 10.0)
+
+
+class RateLimitGate:
+    """Shared back-off: once any worker hits a rate limit, every worker waits it out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def wait(self):
+        while True:
+            with self._lock:
+                delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def back_off(self, attempt):
+        delay = RATE_LIMIT_BASE_DELAY * (2 ** attempt) + random.uniform(0, RATE_LIMIT_BASE_DELAY)
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+
+def _evaluate_one(gate, job_requirements, candidate_id, resume_text, use_cache):
+    skill_check = skill_check_for(job_requirements, resume_text)
+    resume_text, compaction = compact_resume_for_evaluation(job_requirements, resume_text, skill_check=skill_check)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        gate.wait()
+        try:
+            report = evaluate_against_requirements(job_requirements, resume_text, use_cache, skill_check)
+        except Exception as e:
+            if is_rate_limit_error(e) and attempt < RATE_LIMIT_RETRIES:
+                gate.back_off(attempt)
+                continue
+            return {"candidate_id": candidate_id, "status": "error", "error": str(e)}
+        return {
+            "candidate_id": candidate_id,
+            "status": "ok",
+            "score": report.overall_score,
+            "tokens_saved": compaction["tokens_saved"],
+            "evaluation_result": render_markdown(report),
+            "report": report.model_dump(),
+        }
+
+
+def rank_results(results):
+    """Order successful evaluations by score (unscored last) and number them."""
+    scored = [r for r in results if r["status"] == "ok"]
+    scored.sort(key=lambda r: (r["score"] is None, -(r["score"] or 0.0)))
+    for rank, result in enumerate(scored, start=1):
+        result["rank"] = rank
+    return scored + [r for r in results if r["status"] != "ok"]
+
+
+def evaluate_batch(job_requirements, resumes, concurrency=BATCH_DEFAULT_CONCURRENCY, use_cache=True):
+    """Evaluate (candidate_id, resume_text) pairs against one requirements report.
+
+    Crews run on a bounded thread pool; a failure only affects its own item.
+    The pool is no larger than CREW_MAX_CONCURRENCY, since threads beyond the
+    crew slots would only wait for one.
+    """
+    workers = max(1, min(concurrency, BATCH_MAX_CONCURRENCY, CREW_MAX_CONCURRENCY, len(resumes) or 1))
+    gate = RateLimitGate()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-eval") as pool:
+        futures = [
+            pool.submit(_evaluate_one, gate, job_requirements, candidate_id, resume_text, use_cache)
+            for candidate_id, resume_text in resumes
+        ]
+        results = [future.result() for future in futures]
+    return rank_results(results)
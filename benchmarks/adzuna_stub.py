@@ -0,0 +1,125 @@
+"""Local stand-in for the Adzuna search API.
+
+Serves deterministic job listings for any `/<country>/search/<page>` path so the
+Adzuna client, /search_jobs and the benchmarks can run offline:
+
+    python benchmarks/adzuna_stub.py --port 8081 --latency 0.05
+    ADZUNA_BASE_URL=http://127.0.0.1:8081/v1/api/jobs uvicorn app:app
+
+`--fail-every N` answers every Nth request with HTTP 503 (or `--fail-status`,
+with an optional `--retry-after` header) to exercise retries.
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SEARCH_PATH = re.compile(r"/(?P<country>[a-z]{2})/search/(?P<page>\d+)$")
+
+
+def make_job(role, location, index):
+    return {
+        "id": str(100000 + index),
+        "title": f"{role.title()} {index}",
+        "company": {"display_name": f"Company {index % 37}"},
+        "location": {"display_name": location.title()},
+        "redirect_url": f"https://www.adzuna.com/land/ad/{100000 + index}?se=stub",
+        "description": (
+            f"We are hiring a {role} in {location}. Requirements: Python, SQL, "
+            f"machine learning, communication skills, {index % 5 + 1}+ years of experience."
+        ),
+    }
+
+
+class AdzunaStubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    total_results = 1000
+    fail_every = 0
+    fail_status = 503
+    retry_after = None
+    # Requests received so far, failed ones included
+    request_count = 0
+    _counter = itertools.count(1)
+    _counter_lock = threading.Lock()
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        match = SEARCH_PATH.search(parts.path)
+        if match is None:
+            self._send(404, {"error": "not found"})
+            return
+        with self._counter_lock:
+            request_number = next(self._counter)
+            type(self).request_count = request_number
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and request_number % self.fail_every == 0:
+            headers = {"Retry-After": self.retry_after} if self.retry_after is not None else {}
+            self._send(self.fail_status, {"error": "stub failure"}, headers)
+            return
+
+        query = parse_qs(parts.query)
+        role = query.get("what", ["job"])[0]
+        location = query.get("where", ["anywhere"])[0]
+        per_page = int(query.get("results_per_page", ["10"])[0])
+        page = int(match.group("page"))
+        start = (page - 1) * per_page
+        end = min(start + per_page, self.total_results)
+        results = [make_job(role, location, i) for i in range(start, end)]
+        self._send(200, {"count": self.total_results, "results": results})
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port=0, latency=0.0, total_results=1000, fail_every=0, fail_status=503, retry_after=None):
+    """Start the stub on a background thread; returns (server, base_url).
+
+    `server.RequestHandlerClass.request_count` counts the requests received.
+    """
+    handler = type("ConfiguredAdzunaStub", (AdzunaStubHandler,), {
+        "latency": latency,
+        "total_results": total_results,
+        "fail_every": fail_every,
+        "fail_status": fail_status,
+        "retry_after": retry_after,
+        "request_count": 0,
+        "_counter": itertools.count(1),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/api/jobs"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--total-results", type=int, default=1000)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--fail-status", type=int, default=503, help="HTTP status of the failed responses")
+    parser.add_argument("--retry-after", help="Retry-After header sent with the failed responses")
+    args = parser.parse_args()
+    server, base_url = start_stub(
+        args.port, args.latency, args.total_results, args.fail_every, args.fail_status, args.retry_after
+    )
+    print(f"Adzuna stub listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,104 @@
+"""Measure cheap-endpoint latency while evaluations are in flight.
+
+Crew runs are replaced by a sleep so no tokens are spent; everything else
+(executor hand-off, caches, request handling) is the real code path.
+
+    python benchmarks/event_loop_latency.py --evaluations 8 --crew-seconds 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp(prefix="bench-")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(_tmpdir, "llm_cache.db"))
+os.environ.setdefault("REQUIREMENTS_DB_PATH", os.path.join(_tmpdir, "job_requirements.db"))
+os.environ.setdefault("JOB_STORE_PATH", os.path.join(_tmpdir, "jobs.db"))
+os.environ.setdefault("STATE_DB_PATH", os.path.join(_tmpdir, "state.db"))
+os.environ.setdefault("RESUME_DB_PATH", os.path.join(_tmpdir, "resumes.db"))
+os.environ.setdefault("RESUME_VERSIONS_DB_PATH", os.path.join(_tmpdir, "resume_versions.db"))
+
+import crewai  # noqa: E402
+import httpx  # noqa: E402
+from app import app  # noqa: E402
+from reports import EvaluationReport  # noqa: E402
+
+# Research output is free text, but evaluations must validate as an EvaluationReport
+REPORT_JSON = EvaluationReport(
+    overall_score=7,
+    match_assessment="Benchmark report.",
+    matched_skills=["Python"],
+    missing_skills=["SQL"],
+).model_dump_json()
+
+
+class SleepingCrew:
+    """Stand-in for crewai.Crew whose kickoff blocks like an LLM round trip."""
+
+    delay = 1.0
+
+    def __init__(self, **kwargs):
+        self.tasks = kwargs.get("tasks", [])
+
+    def kickoff(self):
+        time.sleep(self.delay)
+        return type("Output", (), {"raw": REPORT_JSON})()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe(client, stop, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/get_saved_job")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main(args):
+    SleepingCrew.delay = args.crew_seconds
+    # pipeline imports Crew from crewai when a crew first runs
+    crewai.Crew = SleepingCrew
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        stop = asyncio.Event()
+        samples = []
+        prober = asyncio.create_task(probe(client, stop, samples))
+        start = time.perf_counter()
+        evaluations = [
+            client.post("/evaluate", json={
+                "job_title": "Data Scientist",
+                "job_des": f"Job description {i}",
+                "resume_text": f"Resume {i}",
+                "use_cache": False,
+            })
+            for i in range(args.evaluations)
+        ]
+        responses = await asyncio.gather(*evaluations)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+    statuses = sorted({r.status_code for r in responses})
+    print(f"evaluations: {args.evaluations} in {elapsed:.2f}s (statuses {statuses})")
+    print(f"/get_saved_job probes: {len(samples)}")
+    print(f"  p50 {statistics.median(samples):.2f} ms")
+    print(f"  p99 {percentile(samples, 99):.2f} ms")
+    print(f"  max {max(samples):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--evaluations", type=int, default=8)
+    parser.add_argument("--crew-seconds", type=float, default=1.0)
+    asyncio.run(main(parser.parse_args()))
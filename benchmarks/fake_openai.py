@@ -0,0 +1,165 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers `/v1/chat/completions` with a canned report (JSON when the prompt asks
+for the structured evaluation schema), wrapped in the "Final Answer:" shape
+CrewAI agents expect (streamed replies get the bare report), so crews and
+streaming evaluations run end to end offline:
+
+    python benchmarks/fake_openai.py --port 8082 --latency 0.5 --tokens 400
+    OPENAI_API_BASE=http://127.0.0.1:8082/v1 uvicorn app:app
+
+`--latency` is the time to first token; `--token-latency` is added per streamed
+token. Reported usage counts words as tokens.
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("python sql experience strong communication leadership cloud testing delivery "
+         "ownership analysis mentoring design stakeholders metrics").split()
+
+
+def make_report(tokens):
+    """A report of roughly `tokens` words ending in a parseable overall score."""
+    body = " ".join(WORDS[i % len(WORDS)] for i in range(max(tokens - 8, 0)))
+    return f"{body}\n\nOverall Score (out of 10): 7"
+
+
+def make_json_section(tokens):
+    """A structured section assessment (see reports.SectionAssessment)."""
+    words = [WORDS[i % len(WORDS)] for i in range(max(tokens // 4, 6))]
+    return json.dumps({
+        "score": 6,
+        "matched_skills": ["python"],
+        "missing_skills": ["kubernetes"],
+        "strengths": [" ".join(words[:len(words) // 2])],
+        "weaknesses": ["no metrics"],
+        "recommendations": [" ".join(words[len(words) // 2:])],
+    })
+
+
+def make_json_report(tokens):
+    """A structured evaluation report (see reports.EvaluationReport) of roughly `tokens` words."""
+    words = [WORDS[i % len(WORDS)] for i in range(max(tokens - 20, 6))]
+    third = len(words) // 3
+    return json.dumps({
+        "overall_score": 7,
+        "match_assessment": " ".join(words[:third]),
+        "matched_skills": ["python", "sql"],
+        "missing_skills": ["kubernetes"],
+        "strengths": [" ".join(words[third:2 * third])],
+        "weaknesses": ["few quantified results"],
+        "ats_tips": ["mirror the job title"],
+        "recommendations": [" ".join(words[2 * third:])],
+    })
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    token_latency = 0.0
+    tokens = 200
+    _counter = itertools.count(1)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+        completion_id = f"chatcmpl-{next(self._counter)}"
+        model = request.get("model", "gpt-4-turbo-preview")
+        if self.latency:
+            time.sleep(self.latency)
+        if request.get("stream"):
+            # Streamed evaluations bypass CrewAI, so they get the bare report
+            self._stream(completion_id, model, make_report(self.tokens))
+            return
+        # Structured prompts name the report fields; answer those with JSON
+        prompt = json.dumps(request.get("messages", []))
+        if "overall_score" in prompt:
+            report = make_json_report(self.tokens)
+        elif "matched_skills" in prompt:
+            report = make_json_section(self.tokens)
+        else:
+            report = make_report(self.tokens)
+        text = f"Thought: I now can give a great answer\nFinal Answer: {report}"
+        self._send(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": self.tokens,
+                "total_tokens": prompt_tokens + self.tokens,
+            },
+        })
+
+    def _stream(self, completion_id, model, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            delta = word if index == len(words) - 1 else word + " "
+            self._event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]})
+        self._event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_openai(port=0, latency=0.0, tokens=200, token_latency=0.0):
+    """Start the fake on a background thread; returns (server, base_url)."""
+    handler = type("ConfiguredFakeOpenAI", (FakeOpenAIHandler,), {
+        "latency": latency,
+        "tokens": tokens,
+        "token_latency": token_latency,
+        "_counter": itertools.count(1),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="seconds per streamed token")
+    parser.add_argument("--tokens", type=int, default=200, help="completion length in tokens")
+    args = parser.parse_args()
+    server, base_url = start_fake_openai(args.port, args.latency, args.tokens, args.token_latency)
+    print(f"Fake OpenAI API listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
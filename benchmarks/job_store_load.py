@@ -0,0 +1,98 @@
+"""Concurrent clients saving, listing and searching jobs must never see each other's data.
+
+Each simulated client uses its own user id and search query against the
+in-process app (Adzuna is served by the local stub), then checks that every
+saved job and every search result it gets back belongs to it.
+
+    python benchmarks/job_store_load.py --clients 100 --jobs-per-client 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from adzuna_stub import start_stub  # noqa: E402
+
+_tmpdir = tempfile.mkdtemp(prefix="bench-")
+_stub, _stub_url = start_stub(latency=0.01)
+os.chdir(_tmpdir)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["ADZUNA_BASE_URL"] = _stub_url
+os.environ["JOB_STORE_PATH"] = os.path.join(_tmpdir, "jobs.db")
+os.environ["LLM_CACHE_PATH"] = os.path.join(_tmpdir, "llm_cache.db")
+os.environ["REQUIREMENTS_DB_PATH"] = os.path.join(_tmpdir, "job_requirements.db")
+os.environ["PREFETCH_SEARCH_REQUIREMENTS"] = "0"
+
+import httpx  # noqa: E402
+import app as app_module  # noqa: E402
+
+# Saving a job researches it in the background, which would call the LLM
+app_module.prefetch_requirements = lambda job: None
+app = app_module.app
+
+
+async def run_client(client, index, jobs_per_client, latencies):
+    user_id = f"user-{index}"
+    role = f"role{index}-client"
+    errors = []
+
+    start = time.perf_counter()
+    response = await client.post("/search_jobs", json={"role": role, "location": "Copenhagen", "num_results": 10})
+    latencies.append((time.perf_counter() - start) * 1000)
+    results = response.json()["results"]
+    if any(not job["Role"].lower().startswith(role) for job in results):
+        errors.append(f"{user_id}: search returned another client's results")
+
+    for job in results[:jobs_per_client]:
+        start = time.perf_counter()
+        await client.post("/save_job", json={"job": job, "user_id": user_id})
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    saved = (await client.get("/saved_jobs", params={"user_id": user_id})).json()["results"]
+    latencies.append((time.perf_counter() - start) * 1000)
+    if len(saved) != min(jobs_per_client, len(results)):
+        errors.append(f"{user_id}: expected {jobs_per_client} saved jobs, found {len(saved)}")
+    if any(not job["Role"].lower().startswith(role) for job in saved):
+        errors.append(f"{user_id}: saved list contains another client's job")
+
+    latest = (await client.get("/get_saved_job", params={"user_id": user_id})).json()
+    if not latest["Role"].lower().startswith(role):
+        errors.append(f"{user_id}: latest saved job belongs to another client")
+    return errors
+
+
+async def main(args):
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*[
+            run_client(client, i, args.jobs_per_client, latencies) for i in range(args.clients)
+        ])
+        elapsed = time.perf_counter() - start
+
+    errors = [error for outcome in outcomes for error in outcome]
+    ordered = sorted(latencies)
+    print(f"clients: {args.clients}, requests: {len(latencies)}, elapsed: {elapsed:.2f}s")
+    print(f"  p50 {statistics.median(ordered):.2f} ms, p99 {ordered[int(0.99 * (len(ordered) - 1))]:.2f} ms")
+    if errors:
+        print(f"cross-talk detected ({len(errors)} problems):")
+        for error in errors[:20]:
+            print("  " + error)
+        sys.exit(1)
+    print("no cross-talk detected")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--jobs-per-client", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
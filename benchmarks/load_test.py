@@ -0,0 +1,245 @@
+"""Offline load test: the real app under uvicorn, against fake OpenAI and Adzuna servers.
+
+Starts benchmarks/fake_openai.py and benchmarks/adzuna_stub.py in-process,
+launches `uvicorn app:app` in a subprocess pointed at them (fresh databases in
+a temp dir), then drives each scenario at every concurrency level and reports
+throughput, p50/p95/p99 latency and the server's resident memory:
+
+    python benchmarks/load_test.py --concurrency 1 8 32 --requests 200
+    python benchmarks/load_test.py --scenarios evaluate --llm-latency 0.5 --max-p95-ms 3000
+
+Scenarios: `search` (/search_jobs), `saved_jobs` (/save_job, /saved_jobs,
+/get_saved_job) and `evaluate` (/evaluate with a distinct resume per request,
+cycling through a few jobs so research is shared as in real use). Any failed
+request, or a p95 above `--max-p95-ms`, makes the script exit non-zero so it
+can gate regressions; `--json` writes the results for comparison across runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import httpx  # noqa: E402
+
+from adzuna_stub import start_stub  # noqa: E402
+from fake_openai import start_fake_openai  # noqa: E402
+
+SCENARIOS = ("search", "saved_jobs", "evaluate")
+RESUME_TEMPLATE = """Candidate {index}
+SUMMARY
+Data engineer with {years} years of experience building Python and SQL pipelines.
+EXPERIENCE
+- Built streaming ingestion for {index} customers on AWS
+- Led a team of {years} engineers and mentored juniors
+SKILLS
+Python, SQL, Airflow, Spark, Docker, communication
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def memory_kb(pid):
+    """Current and peak resident set size of `pid` in KiB, from /proc."""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return values.get("VmRSS"), values.get("VmHWM")
+
+
+def percentile(ordered, fraction):
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def start_server(args, adzuna_url, openai_url, workdir):
+    port = free_port()
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "sk-benchmark",
+        "OPENAI_API_BASE": openai_url,
+        "OPENAI_BASE_URL": openai_url,
+        "ADZUNA_BASE_URL": adzuna_url,
+        "ADZUNA_APP_ID": "benchmark",
+        "ADZUNA_APP_KEY": "benchmark",
+        "JOB_STORE_PATH": os.path.join(workdir, "jobs.db"),
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.db"),
+        "REQUIREMENTS_DB_PATH": os.path.join(workdir, "job_requirements.db"),
+        "RESUME_DB_PATH": os.path.join(workdir, "resumes.db"),
+        "RESUME_VERSIONS_DB_PATH": os.path.join(workdir, "resume_versions.db"),
+        "STATE_DB_PATH": os.path.join(workdir, "state.db"),
+        "PREFETCH_SEARCH_REQUIREMENTS": "0",
+        "CREW_VERBOSE": "0",
+        # Keep CrewAI and LiteLLM from reaching out to the network
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+        "PYTHONPATH": ROOT,
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--workers", str(args.workers)],
+        cwd=workdir, env=env,
+        stdout=None if args.server_output else subprocess.DEVNULL,
+        stderr=None if args.server_output else subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"server exited with code {process.returncode}; rerun with --server-output")
+        try:
+            if httpx.get(f"{base_url}/cache/stats", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit("server did not become ready within 60s")
+
+
+def search_request(index):
+    return [("POST", "/search_jobs", {"role": f"data engineer {index % 20}", "location": "Berlin", "num_results": 10})]
+
+
+def saved_jobs_requests(index):
+    user_id = f"bench-user-{index}"
+    job = {"Id": str(index), "Role": f"Engineer {index}", "Company": f"Company {index % 7}",
+           "Location": "Berlin", "Link": f"https://example.com/jobs/{index}", "Description": "Python and SQL."}
+    return [
+        ("POST", "/save_job", {"job": job, "user_id": user_id}),
+        ("GET", f"/saved_jobs?user_id={user_id}", None),
+        ("GET", f"/get_saved_job?user_id={user_id}", None),
+    ]
+
+
+def evaluate_request(index, jobs):
+    job = index % jobs
+    return [("POST", "/evaluate", {
+        "job_title": f"Data Engineer {job}",
+        "job_des": f"Job {job}: build Python and SQL pipelines, Airflow, cloud experience required.",
+        "job_link": f"https://example.com/jobs/{job}",
+        "resume_text": RESUME_TEMPLATE.format(index=index, years=index % 12 + 1),
+    })]
+
+
+def build_requests(scenario, count, offset, args):
+    """`count` request sequences numbered from `offset`, so later rounds never
+    reuse cached evaluations. Requests within a sequence run one after another."""
+    indices = range(offset, offset + count)
+    if scenario == "search":
+        return [search_request(i) for i in indices]
+    if scenario == "saved_jobs":
+        return [saved_jobs_requests(i) for i in indices]
+    return [evaluate_request(i, args.jobs) for i in indices]
+
+
+async def run_scenario(client, sequences, concurrency):
+    latencies, failures = [], []
+    queue = asyncio.Queue()
+    for sequence in sequences:
+        queue.put_nowait(sequence)
+
+    async def worker():
+        while not queue.empty():
+            for method, path, body in queue.get_nowait():
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    if response.status_code >= 400:
+                        failures.append(f"{method} {path}: HTTP {response.status_code} {response.text[:200]}")
+                except httpx.HTTPError as e:
+                    failures.append(f"{method} {path}: {type(e).__name__} {e}")
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, failures, time.perf_counter() - start
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    _adzuna, adzuna_url = start_stub(latency=args.adzuna_latency)
+    _openai, openai_url = start_fake_openai(latency=args.llm_latency, tokens=args.llm_tokens)
+    process, base_url = start_server(args, adzuna_url, openai_url, workdir)
+    results, problems = [], []
+    try:
+        limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            for scenario in args.scenarios:
+                # Unmeasured requests first, so lazy imports and first-use setup stay out of the numbers
+                await run_scenario(client, build_requests(scenario, args.warmup, -args.warmup, args), 1)
+                for round_number, concurrency in enumerate(args.concurrency):
+                    requests = build_requests(scenario, args.requests, round_number * args.requests, args)
+                    latencies, failures, elapsed = await run_scenario(client, requests, concurrency)
+                    ordered = sorted(latencies)
+                    rss, peak = memory_kb(process.pid)
+                    row = {
+                        "scenario": scenario,
+                        "concurrency": concurrency,
+                        "requests": len(latencies),
+                        "errors": len(failures),
+                        "throughput_rps": len(latencies) / elapsed,
+                        "p50_ms": statistics.median(ordered),
+                        "p95_ms": percentile(ordered, 0.95),
+                        "p99_ms": percentile(ordered, 0.99),
+                        "rss_mb": rss / 1024 if rss else None,
+                        "peak_rss_mb": peak / 1024 if peak else None,
+                    }
+                    results.append(row)
+                    print(
+                        f"{scenario:<11} c={concurrency:<4} {row['requests']:>5} req {row['errors']:>4} err "
+                        f"{row['throughput_rps']:8.1f} req/s  p50 {row['p50_ms']:8.1f}  p95 {row['p95_ms']:8.1f}  "
+                        f"p99 {row['p99_ms']:8.1f} ms  rss {row['rss_mb'] or 0:6.1f} MB (peak {row['peak_rss_mb'] or 0:.1f})"
+                    )
+                    problems.extend(f"{scenario} c={concurrency}: {failure}" for failure in failures[:5])
+                    if args.max_p95_ms is not None and row["p95_ms"] > args.max_p95_ms:
+                        problems.append(f"{scenario} c={concurrency}: p95 {row['p95_ms']:.1f} ms > {args.max_p95_ms} ms")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({"settings": vars(args), "results": results}, output, indent=2)
+    if problems:
+        print(f"FAILED ({len(problems)} problems):")
+        for problem in problems[:20]:
+            print("  " + problem)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="request sequences per scenario and concurrency level")
+    parser.add_argument("--jobs", type=int, default=5, help="distinct jobs the evaluate scenario cycles through")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="fake LLM seconds per completion")
+    parser.add_argument("--llm-tokens", type=int, default=300, help="fake LLM completion length")
+    parser.add_argument("--adzuna-latency", type=float, default=0.05)
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured requests before each scenario")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn worker processes (memory is then reported for the supervisor only)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="fail if any scenario's p95 exceeds this")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--server-output", action="store_true", help="show the app's own logs")
+    asyncio.run(main(parser.parse_args()))
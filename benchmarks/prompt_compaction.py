@@ -0,0 +1,95 @@
+"""Token savings and cost of resume compaction over a corpus of resumes.
+
+    python benchmarks/prompt_compaction.py path/to/resumes --budget 1500
+
+The corpus is a directory of .txt or .pdf resumes. Without one, a set of
+synthetic resumes with typical PDF extraction noise (running headers, page
+footers, duplicated lines, whitespace runs) is generated.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compaction import compact_resume, PAGE_BREAK  # noqa: E402
+
+REQUIREMENTS = """Essential skills: Python, SQL, machine learning, statistics, A/B testing,
+data visualization, cloud platforms (AWS or GCP). Experience: 3+ years as a data scientist.
+Education: degree in computer science, statistics or a related field. Soft skills:
+communication, stakeholder management."""
+
+SKILLS = ["Python", "SQL", "Spark", "Tableau", "AWS", "Docker", "Kubernetes", "Excel", "Java",
+          "statistics", "machine learning", "forecasting", "A/B testing", "Airflow", "React"]
+
+
+def synthetic_resume(seed, pages):
+    rng = random.Random(seed)
+    name = f"Candidate {seed}"
+    lines = [name, f"candidate{seed}@example.com | +45 1234 5678", "", "SUMMARY",
+             "Data professional with a track record of shipping analytics products.   ", ""]
+    lines.append("EXPERIENCE")
+    for job in range(pages * 3):
+        lines.append(f"Company {rng.randint(1, 99)} — Analyst {job}   2015 - 2020")
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f"•   Built {rng.choice(SKILLS)} pipelines improving {rng.choice(SKILLS)} reporting by {rng.randint(5, 60)}%")
+        lines.append("")
+    lines += ["EDUCATION", "MSc Statistics, University of Copenhagen", "", "SKILLS", ", ".join(rng.sample(SKILLS, 8))]
+    lines += ["", "INTERESTS", "Cycling, photography, chess, cooking"] * 2
+
+    # Paginate with running header/footer the way PDF extraction returns it
+    per_page = max(len(lines) // pages, 1)
+    out = []
+    for page in range(pages):
+        page_lines = [f"{name} — Curriculum Vitae", ""]
+        page_lines += lines[page * per_page:(page + 1) * per_page]
+        page_lines += ["", f"Page {page + 1} of {pages}", "Confidential"]
+        out.append("\n".join(page_lines))
+    return PAGE_BREAK.join(out)
+
+
+def load_corpus(path):
+    resumes = []
+    for filename in sorted(os.listdir(path)):
+        full = os.path.join(path, filename)
+        if filename.endswith(".txt"):
+            with open(full, "r", encoding="utf-8", errors="ignore") as file:
+                resumes.append((filename, file.read()))
+        elif filename.endswith(".pdf"):
+            from resumes import extract_pdf_text
+            with open(full, "rb") as file:
+                resumes.append((filename, extract_pdf_text(file.read())[0]))
+    return resumes
+
+
+def main(args):
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = [(f"synthetic-{i}", synthetic_resume(i, pages=1 + i % 5)) for i in range(args.samples)]
+
+    rows = []
+    for name, text in corpus:
+        start = time.perf_counter()
+        _, stats = compact_resume(text, REQUIREMENTS, args.budget)
+        rows.append((name, stats, (time.perf_counter() - start) * 1000))
+
+    print(f"{'resume':<24}{'before':>8}{'after':>8}{'saved':>8}{'ms':>8}")
+    for name, stats, elapsed in rows:
+        print(f"{name[:23]:<24}{stats['original_tokens']:>8}{stats['compacted_tokens']:>8}"
+              f"{stats['tokens_saved']:>8}{elapsed:>8.2f}")
+    before = sum(stats["original_tokens"] for _, stats, _ in rows)
+    saved = sum(stats["tokens_saved"] for _, stats, _ in rows)
+    print(f"\n{len(rows)} resumes, {before} tokens before, {saved} saved "
+          f"({saved / before:.1%}), median {statistics.median(ms for *_, ms in rows):.2f} ms per resume")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", help="directory of .txt/.pdf resumes")
+    parser.add_argument("--budget", type=int, default=1500, help="resume token budget")
+    parser.add_argument("--samples", type=int, default=20, help="synthetic resumes when no corpus is given")
+    main(parser.parse_args())
@@ -0,0 +1,56 @@
+"""Import time and resident memory of the API process at start-up.
+
+Each run imports `app` in a fresh interpreter (no OpenAI key set) and reports
+wall time, peak RSS and whether crewai/langchain were loaded eagerly.
+
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "crewai_loaded": "crewai" in sys.modules,
+    "langchain_loaded": "langchain_openai" in sys.modules,
+}))
+"""
+
+
+def run_once(workdir):
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    env["PYTHONPATH"] = ROOT
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    runs = [run_once(workdir) for _ in range(args.runs)]
+    seconds = [run["seconds"] for run in runs]
+    rss = [run["max_rss_mb"] for run in runs]
+    print(f"runs: {args.runs}")
+    print(f"  import app: median {statistics.median(seconds):.3f}s, min {min(seconds):.3f}s")
+    print(f"  peak RSS:   median {statistics.median(rss):.1f} MB")
+    print(f"  crewai loaded at import: {runs[-1]['crewai_loaded']}, langchain_openai: {runs[-1]['langchain_loaded']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,184 @@
+import functools
+import os
+import re
+import unicodedata
+from collections import Counter
+
+import tiktoken
+
+from ranking import similarity_scores
+
+EVAL_PROMPT_TOKEN_BUDGET = int(os.getenv("EVAL_PROMPT_TOKEN_BUDGET", 6000))
+# Resume tokens kept even when the rest of the prompt leaves less room than this
+MIN_RESUME_TOKENS = int(os.getenv("MIN_RESUME_TOKENS", 256))
+TOKENIZER_MODEL = os.getenv("TOKENIZER_MODEL", "gpt-4-turbo-preview")
+
+SECTION_HEADINGS = {
+    "summary", "profile", "professional summary", "objective", "about me",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "education", "skills", "technical skills", "core competencies", "projects", "certifications",
+    "certificates", "awards", "publications", "languages", "volunteering", "interests", "references",
+}
+PAGE_MARKER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+BULLET = re.compile(r"^[•●▪◦‣⁃∙*·-]+\s*")
+# Extracted PDF pages are joined with a form feed
+PAGE_BREAK = "\f"
+# Lines this close to a page's top or bottom can be running headers/footers
+RUNNING_EDGE_LINES = 3
+
+
+# Rough characters-per-token ratio used when the tiktoken encoding is unavailable
+CHARS_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=4)
+def _encoding(model):
+    """tiktoken encoding for `model`, or None if it cannot be loaded (tiktoken
+    downloads encodings on first use, which fails offline)."""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"tiktoken unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text, model=TOKENIZER_MODEL):
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text or "") // CHARS_PER_TOKEN)
+    return len(encoding.encode(text or "", disallowed_special=()))
+
+
+def _truncate_tokens(text, max_tokens, model=TOKENIZER_MODEL):
+    max_tokens = max(max_tokens, 0)
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def _clean_line(line):
+    return re.sub(r"[ \t ]+", " ", line).strip()
+
+
+def running_lines(pages):
+    """Short lines at the top or bottom of at least half the pages (and of two
+    or more): running headers and footers. Single-page text has none, so
+    lines repeated in the body (a job title, "Remote") are kept."""
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for page in pages:
+        lines = [line for line in map(_clean_line, page.splitlines()) if line and len(line) <= 80]
+        counts.update(set(lines[:RUNNING_EDGE_LINES] + lines[-RUNNING_EDGE_LINES:]))
+    return {line for line, count in counts.items() if count >= max(2, len(pages) / 2)}
+
+
+def normalize_text(text):
+    """Clean PDF extraction noise: page markers, repeats of running
+    headers/footers (the first occurrence, often the name and contact line,
+    stays), duplicate lines, bullet glyphs and whitespace runs."""
+    text = unicodedata.normalize("NFKC", text or "")
+    repeated = running_lines(text.split(PAGE_BREAK))
+    lines = [_clean_line(line) for line in text.splitlines()]
+
+    cleaned = []
+    seen = set()
+    seen_running = set()
+    for line in lines:
+        if not line:
+            if cleaned and cleaned[-1]:
+                cleaned.append("")
+            continue
+        if PAGE_MARKER.match(line):
+            continue
+        if line in repeated:
+            if line in seen_running:
+                continue
+            seen_running.add(line)
+        line = BULLET.sub("- ", line)
+        key = line.lower()
+        if len(line) > 20 and key in seen:
+            continue
+        seen.add(key)
+        cleaned.append(line)
+    return "\n".join(cleaned).strip()
+
+
+def _is_heading(line):
+    bare = line.strip().rstrip(":").strip()
+    if not bare or len(bare) > 40:
+        return False
+    return bare.lower() in SECTION_HEADINGS or (bare.isupper() and len(bare.split()) <= 4)
+
+
+def split_sections(text):
+    """Split resume text into (heading, body) pairs; text before the first
+    heading (name, contact details) becomes a section with an empty heading."""
+    sections = []
+    heading, body = "", []
+    for line in text.splitlines():
+        if _is_heading(line):
+            if heading or any(body):
+                sections.append((heading, "\n".join(body).strip()))
+            heading, body = line.strip().rstrip(":"), []
+        else:
+            body.append(line)
+    if heading or any(body):
+        sections.append((heading, "\n".join(body).strip()))
+    return sections
+
+
+def _section_text(section):
+    heading, body = section
+    return f"{heading}\n{body}".strip()
+
+
+def compact_resume(resume_text, job_requirements, token_budget, model=TOKENIZER_MODEL):
+    """Fit a resume into `token_budget` tokens for the evaluation prompt.
+
+    The text is normalized first. If it is still too long, sections are kept in
+    order of relevance to the job requirements (the leading contact section
+    always stays) and written back in their original order; the last section
+    that only partly fits is truncated. At least `MIN_RESUME_TOKENS` are kept,
+    even when that goes over `token_budget`, so the evaluator never gets an
+    empty resume.
+
+    Returns (compacted_text, stats) where stats has original_tokens,
+    compacted_tokens and tokens_saved.
+    """
+    token_budget = max(token_budget, MIN_RESUME_TOKENS)
+    original_tokens = count_tokens(resume_text, model)
+    text = normalize_text(resume_text)
+    tokens = count_tokens(text, model)
+
+    if tokens > token_budget:
+        sections = split_sections(text)
+        section_tokens = [count_tokens(_section_text(section), model) for section in sections]
+        relevance = similarity_scores(job_requirements, [_section_text(section) for section in sections])
+        order = sorted(range(len(sections)), key=lambda i: (i != 0, -float(relevance[i])))
+
+        kept = {}
+        remaining = token_budget
+        for index in order:
+            if remaining <= 0:
+                break
+            section = _section_text(sections[index])
+            if section_tokens[index] > remaining:
+                section = _truncate_tokens(section, remaining, model)
+            kept[index] = section
+            remaining -= min(section_tokens[index], remaining)
+        text = "\n\n".join(kept[index] for index in sorted(kept))
+        tokens = count_tokens(text, model)
+
+    return text, {
+        "original_tokens": original_tokens,
+        "compacted_tokens": tokens,
+        "tokens_saved": max(original_tokens - tokens, 0),
+    }
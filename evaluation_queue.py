@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from backends import state_backend
+from pipeline import (
+    get_job_requirements, evaluate_against_requirements, compact_resume_for_evaluation, skill_check_for
+)
+from reports import render_markdown
+
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", 4))
+EVALUATION_RESULT_TTL_SECONDS = int(os.getenv("EVALUATION_RESULT_TTL_SECONDS", 3600))
+# How long shutdown waits for running evaluations before failing them
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", 60))
+
+# Job lifecycle: queued -> researching -> evaluating -> completed | failed
+QUEUED = "queued"
+RESEARCHING = "researching"
+EVALUATING = "evaluating"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class QueueDraining(RuntimeError):
+    """Raised by `submit` once the queue has started draining for shutdown."""
+
+
+class EvaluationQueue:
+    """Queue running evaluations on a fixed pool of worker threads.
+
+    Job records live in the shared state backend, so any worker process can
+    answer a poll for a job another one is running. Records expire
+    `result_ttl` seconds after their last update.
+    """
+
+    def __init__(self, workers=EVALUATION_WORKERS, result_ttl=EVALUATION_RESULT_TTL_SECONDS, backend=None):
+        self.result_ttl = result_ttl
+        self._backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="evaluation")
+        self._lock = threading.Lock()
+        # Jobs running in this process
+        self._jobs = {}
+        self._futures = set()
+        self._draining = False
+
+    @property
+    def backend(self):
+        return self._backend or state_backend()
+
+    def submit(self, job_title, job_des, resume_text, job_link=None, use_cache=True):
+        evaluation_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            if self._draining:
+                raise QueueDraining("The server is shutting down; submit the evaluation again shortly.")
+            self._jobs[evaluation_id] = {
+                "id": evaluation_id,
+                "status": QUEUED,
+                "created_at": now,
+                "updated_at": now,
+                "job_requirements": None,
+                "evaluation_result": None,
+                "report": None,
+                "tokens_saved": 0,
+                "error": None,
+            }
+            self._save(self._jobs[evaluation_id])
+            future = self._executor.submit(
+                self._run, evaluation_id, job_title, job_des, resume_text, job_link, use_cache
+            )
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return evaluation_id
+
+    def get(self, evaluation_id):
+        return self.backend.get("evaluations", evaluation_id)
+
+    def drain(self, timeout=SHUTDOWN_DRAIN_SECONDS):
+        """Stop accepting jobs and give running ones up to `timeout` seconds.
+
+        Jobs still unfinished after that are recorded as failed so clients stop
+        polling. Returns how many were cut off.
+        """
+        with self._lock:
+            self._draining = True
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            unfinished = list(self._jobs)
+        for evaluation_id in unfinished:
+            self._update(evaluation_id, status=FAILED, error="The server shut down before the evaluation finished.")
+        return len(unfinished)
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _save(self, job):
+        self.backend.set("evaluations", job["id"], job, self.result_ttl)
+
+    def _update(self, evaluation_id, **fields):
+        with self._lock:
+            job = self._jobs.get(evaluation_id)
+            if job is None:
+                return
+            job.update(fields, updated_at=time.time())
+            if job["status"] in (COMPLETED, FAILED):
+                del self._jobs[evaluation_id]
+            self._save(job)
+
+    def _run(self, evaluation_id, job_title, job_des, resume_text, job_link, use_cache):
+        try:
+            self._update(evaluation_id, status=RESEARCHING)
+            job_requirements = get_job_requirements(job_title, job_des, job_link, use_cache)
+            self._update(evaluation_id, status=EVALUATING, job_requirements=job_requirements)
+            skill_check = skill_check_for(job_requirements, resume_text)
+            resume_text, compaction = compact_resume_for_evaluation(job_requirements, resume_text, skill_check=skill_check)
+            report = evaluate_against_requirements(job_requirements, resume_text, use_cache, skill_check)
+            self._update(
+                evaluation_id,
+                status=COMPLETED,
+                evaluation_result=render_markdown(report),
+                report=report.model_dump(),
+                tokens_saved=compaction["tokens_saved"],
+            )
+        except Exception as e:
+            self._update(evaluation_id, status=FAILED, error=str(e))
+
+
+evaluation_queue = EvaluationQueue()
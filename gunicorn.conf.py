@@ -0,0 +1,15 @@
+# Production settings: gunicorn -c gunicorn.conf.py app:app  (pip install gunicorn)
+# `python app.py --workers N` runs the same setup with uvicorn's own supervisor.
+import multiprocessing
+import os
+
+bind = os.getenv("APP_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("APP_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Each worker opens its own SQLite connections, thread pools and LLM clients
+preload_app = False
+# Crews run off the event loop, so workers keep answering heartbeats during long evaluations
+timeout = 60
+keepalive = 5
+# Requests in flight, then queued evaluations, each get SHUTDOWN_DRAIN_SECONDS to finish
+graceful_timeout = 2 * int(float(os.getenv("SHUTDOWN_DRAIN_SECONDS", 60))) + 10
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from compaction import normalize_text, split_sections, count_tokens
+from job_store import DEFAULT_USER
+from pipeline import get_job_requirements, evaluate_section
+from reports import EvaluationReport, SectionAssessment, render_markdown
+from requirements_store import job_fingerprint
+
+RESUME_VERSIONS_DB_PATH = os.getenv("RESUME_VERSIONS_DB_PATH", "resume_versions.db")
+INCREMENTAL_SECTION_CONCURRENCY = int(os.getenv("INCREMENTAL_SECTION_CONCURRENCY", 4))
+# Cap on items merged into each list of the combined report
+MERGED_LIST_LIMIT = 8
+
+
+def section_hash(heading, body):
+    """Content hash of a section; whitespace-only edits keep the same hash."""
+    text = f"{heading.strip().lower()}\n{' '.join(body.split())}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def resume_sections(resume_text):
+    """(heading, body, hash) for each non-empty section of the normalized resume text."""
+    sections = split_sections(normalize_text(resume_text))
+    return [(heading, body, section_hash(heading, body)) for heading, body in sections if body]
+
+
+class ResumeVersionStore:
+    """Section hashes of each resume version a user evaluated against a job, and
+    cached per-section assessments keyed by (job fingerprint, section hash)."""
+
+    def __init__(self, path=RESUME_VERSIONS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS resume_versions (
+                user_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                sections TEXT NOT NULL,
+                overall_score REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (user_id, fingerprint, version)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS section_assessments (
+                fingerprint TEXT NOT NULL,
+                section_hash TEXT NOT NULL,
+                assessment TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (fingerprint, section_hash)
+            )"""
+        )
+        self._conn.commit()
+
+    def latest(self, user_id, fingerprint):
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT version, sections, overall_score FROM resume_versions
+                WHERE user_id = ? AND fingerprint = ? ORDER BY version DESC LIMIT 1""",
+                (user_id, fingerprint),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"version": row[0], "sections": json.loads(row[1]), "overall_score": row[2]}
+
+    def add_version(self, user_id, fingerprint, sections, overall_score):
+        """Store a new version ({heading, hash} per section); returns its number."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM resume_versions WHERE user_id = ? AND fingerprint = ?",
+                (user_id, fingerprint),
+            ).fetchone()
+            version = row[0] + 1
+            self._conn.execute(
+                "INSERT INTO resume_versions VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, fingerprint, version, json.dumps(sections), overall_score, time.time()),
+            )
+            self._conn.commit()
+        return version
+
+    def get_assessments(self, fingerprint, hashes):
+        if not hashes:
+            return {}
+        placeholders = ",".join("?" * len(hashes))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT section_hash, assessment FROM section_assessments
+                WHERE fingerprint = ? AND section_hash IN ({placeholders})""",
+                (fingerprint, *hashes),
+            ).fetchall()
+        return {row[0]: SectionAssessment.model_validate_json(row[1]) for row in rows}
+
+    def put_assessment(self, fingerprint, section_hash, assessment):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO section_assessments VALUES (?, ?, ?, ?)",
+                (fingerprint, section_hash, assessment.model_dump_json(), time.time()),
+            )
+            self._conn.commit()
+
+
+def _merge_lists(labelled_lists):
+    merged, seen = [], set()
+    for label, items in labelled_lists:
+        for item in items:
+            key = item.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(f"{label}: {item}" if label else item)
+    return merged[:MERGED_LIST_LIMIT]
+
+
+def merge_assessments(sections, assessments):
+    """Combine per-section assessments into one EvaluationReport.
+
+    The overall score is the mean of section scores weighted by section length
+    in tokens; a skill counts as missing only if no section demonstrates it.
+    """
+    scored = [(heading, body, assessments[digest]) for heading, body, digest in sections if digest in assessments]
+    weights = [max(count_tokens(body), 1) for _, body, _ in scored]
+    total = sum(weights) or 1
+    overall = sum(weight * assessment.score for weight, (_, _, assessment) in zip(weights, scored)) / total
+
+    matched = _merge_lists(("", a.matched_skills) for _, _, a in scored)
+    matched_keys = {skill.lower() for _, _, a in scored for skill in a.matched_skills}
+    missing = _merge_lists(
+        ("", [skill for skill in a.missing_skills if skill.lower() not in matched_keys]) for _, _, a in scored
+    )
+    ranked = sorted(scored, key=lambda item: item[2].score)
+    strongest = ", ".join(heading or "Header" for heading, _, _ in ranked[::-1][:2])
+    weakest = ", ".join(heading or "Header" for heading, _, _ in ranked[:2])
+    return EvaluationReport(
+        overall_score=round(overall, 1),
+        match_assessment=(
+            f"Combined from {len(scored)} section assessments. "
+            f"Strongest sections: {strongest or 'none'}. Weakest sections: {weakest or 'none'}."
+        ),
+        matched_skills=matched,
+        missing_skills=missing,
+        strengths=_merge_lists((heading or "Header", a.strengths) for heading, _, a in ranked[::-1]),
+        weaknesses=_merge_lists((heading or "Header", a.weaknesses) for heading, _, a in ranked),
+        ats_tips=[],
+        recommendations=_merge_lists((heading or "Header", a.recommendations) for heading, _, a in ranked),
+    )
+
+
+def evaluate_incremental(job_title, job_des, resume_text, job_link=None, user_id=DEFAULT_USER, use_cache=True):
+    """Evaluate a resume section by section, re-assessing only sections whose
+    content changed since any earlier evaluation against the same job.
+
+    Returns the merged report plus a per-section diff against the user's
+    previous version for this job.
+    """
+    fingerprint = job_fingerprint(job_title, job_des, job_link)
+    job_requirements = get_job_requirements(job_title, job_des, job_link, use_cache)
+    sections = resume_sections(resume_text)
+
+    hashes = [digest for _, _, digest in sections]
+    assessments = resume_versions.get_assessments(fingerprint, hashes) if use_cache else {}
+    pending = [(heading, body, digest) for heading, body, digest in sections if digest not in assessments]
+    if pending:
+        workers = max(1, min(INCREMENTAL_SECTION_CONCURRENCY, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section-eval") as pool:
+            futures = {
+                digest: pool.submit(evaluate_section, job_requirements, heading, body, use_cache)
+                for heading, body, digest in pending
+            }
+            for digest, future in futures.items():
+                assessments[digest] = future.result()
+                resume_versions.put_assessment(fingerprint, digest, assessments[digest])
+
+    report = merge_assessments(sections, assessments)
+    previous = resume_versions.latest(user_id, fingerprint)
+    previous_hashes = {section["hash"] for section in previous["sections"]} if previous else set()
+    previous_headings = {section["heading"].lower() for section in previous["sections"]} if previous else set()
+    current = [{"heading": heading, "hash": digest} for heading, _, digest in sections]
+    if previous and [section["hash"] for section in previous["sections"]] == hashes:
+        version = previous["version"]
+    else:
+        version = resume_versions.add_version(user_id, fingerprint, current, report.overall_score)
+
+    def change(heading, digest):
+        if digest in previous_hashes:
+            return "unchanged"
+        return "changed" if heading.lower() in previous_headings else "added"
+
+    reevaluated = {digest for _, _, digest in pending}
+    return {
+        "job_requirements": job_requirements,
+        "version": version,
+        "previous_version": previous["version"] if previous else None,
+        "previous_overall_score": previous["overall_score"] if previous else None,
+        "report": report,
+        "evaluation_result": render_markdown(report),
+        "sections": [
+            {
+                "heading": heading or "Header",
+                "hash": digest,
+                "change": change(heading, digest) if previous else "added",
+                "reevaluated": digest in reevaluated,
+                "score": assessments[digest].score,
+            }
+            for heading, _, digest in sections
+        ],
+        "removed_sections": sorted(
+            {section["heading"] or "Header" for section in previous["sections"]}
+            - {heading or "Header" for heading, _, _ in sections}
+        ) if previous else [],
+        "sections_reevaluated": len(reevaluated),
+        "sections_reused": len(sections) - len(reevaluated),
+    }
+
+
+resume_versions = ResumeVersionStore()
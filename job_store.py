@@ -0,0 +1,112 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from requirements_store import job_fingerprint_for
+
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs.db")
+LEGACY_SAVED_JOB_PATH = "saved_jobs.json"
+DEFAULT_USER = "default"
+
+
+def job_id_for(job):
+    """Adzuna id when the job has one, otherwise its content fingerprint."""
+    return str(job.get("Id") or job_fingerprint_for(job))
+
+
+class JobStore:
+    """Per-user saved jobs in SQLite (WAL mode), safe for concurrent requests.
+
+    Every write is a single transaction, so readers never see a half-saved job.
+    """
+
+    def __init__(self, path=JOB_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS saved_jobs (
+                    user_id TEXT NOT NULL,
+                    job_id TEXT NOT NULL,
+                    role TEXT,
+                    company TEXT,
+                    location TEXT,
+                    link TEXT,
+                    payload TEXT NOT NULL,
+                    saved_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, job_id)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_saved_jobs_user_time ON saved_jobs (user_id, saved_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_saved_jobs_job_id ON saved_jobs (job_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_saved_jobs_company ON saved_jobs (company)")
+        self._import_legacy_file()
+
+    def _import_legacy_file(self):
+        """Carry over the single favourite kept in saved_jobs.json by earlier versions."""
+        if not os.path.exists(LEGACY_SAVED_JOB_PATH):
+            return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM saved_jobs LIMIT 1").fetchone():
+                return
+        try:
+            with open(LEGACY_SAVED_JOB_PATH, "r") as file:
+                job = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(job, dict) and job:
+            self.save(job)
+
+    def save(self, job, user_id=DEFAULT_USER):
+        job_id = job_id_for(job)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO saved_jobs
+                (user_id, job_id, role, company, location, link, payload, saved_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    user_id, job_id, job.get("Role"), job.get("Company"), job.get("Location"),
+                    job.get("Link"), json.dumps(job), time.time(),
+                ),
+            )
+        return job_id
+
+    def latest(self, user_id=DEFAULT_USER):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM saved_jobs WHERE user_id = ? ORDER BY saved_at DESC LIMIT 1", (user_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get(self, job_id, user_id=DEFAULT_USER):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM saved_jobs WHERE user_id = ? AND job_id = ?", (user_id, job_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, user_id=DEFAULT_USER, company=None):
+        query = "SELECT payload FROM saved_jobs WHERE user_id = ?"
+        params = [user_id]
+        if company:
+            query += " AND company = ?"
+            params.append(company)
+        query += " ORDER BY saved_at DESC"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def delete(self, job_id, user_id=DEFAULT_USER):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM saved_jobs WHERE user_id = ? AND job_id = ?", (user_id, job_id)
+            )
+        return cursor.rowcount > 0
+
+
+job_store = JobStore()
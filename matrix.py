@@ -0,0 +1,135 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import RateLimitGate, is_rate_limit_error, parse_overall_score, RATE_LIMIT_RETRIES
+from job_store import job_id_for
+from pipeline import get_job_requirements, compact_resume_for_match, score_match
+from ranking import tfidf_matrix, job_text
+
+MATRIX_MAX_CELLS = int(os.getenv("MATRIX_MAX_CELLS", 400))
+MATRIX_DEFAULT_CONCURRENCY = int(os.getenv("MATRIX_DEFAULT_CONCURRENCY", 4))
+MATRIX_MAX_CONCURRENCY = int(os.getenv("MATRIX_MAX_CONCURRENCY", 16))
+# Pairs whose TF-IDF similarity falls below this are not sent to the LLM
+MATRIX_MIN_FIT = float(os.getenv("MATRIX_MIN_FIT", 0.05))
+
+
+def fit_matrix(resume_texts, jobs):
+    """M x N TF-IDF cosine similarities between resumes and jobs, on one shared vocabulary."""
+    matrix = tfidf_matrix(list(resume_texts) + [job_text(job) for job in jobs])
+    return matrix[:len(resume_texts)] @ matrix[len(resume_texts):].T
+
+
+def select_pairs(fit, min_fit=MATRIX_MIN_FIT, top_k=None):
+    """(resume_index, job_index) pairs worth an LLM call: similarity at least
+    `min_fit` and, with `top_k`, among each resume's `top_k` best jobs."""
+    selected = set()
+    for i, row in enumerate(fit):
+        order = sorted(range(len(row)), key=lambda j: -float(row[j]))
+        if top_k is not None:
+            order = order[:top_k]
+        selected.update((i, j) for j in order if row[j] >= min_fit)
+    return selected
+
+
+def parse_match(answer):
+    """Structured fields from the scoring prompt's JSON answer; falls back to
+    pulling a score out of free text when the model ignored the format."""
+    match = re.search(r"\{.*\}", answer or "", flags=re.DOTALL)
+    data = {}
+    if match:
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            data = {}
+    try:
+        score = min(max(float(data["score"]), 0.0), 10.0)
+    except (KeyError, TypeError, ValueError):
+        score = parse_overall_score(answer)
+    return {
+        "score": score,
+        "matched": [str(item) for item in data.get("matched") or []][:5],
+        "missing": [str(item) for item in data.get("missing") or []][:5],
+        "summary": str(data.get("summary") or ""),
+    }
+
+
+def _scored(answer):
+    return parse_match(answer)["score"] is not None
+
+
+def _score_cell(gate, job_requirements, resume_text, use_cache):
+    resume_text, _ = compact_resume_for_match(job_requirements, resume_text)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        gate.wait()
+        try:
+            # Answers without a score are not cached, so the next request asks again
+            match = parse_match(score_match(job_requirements, resume_text, use_cache, cache_if=_scored))
+        except Exception as e:
+            if is_rate_limit_error(e) and attempt < RATE_LIMIT_RETRIES:
+                gate.back_off(attempt)
+                continue
+            raise
+        if match["score"] is None:
+            raise ValueError("The model's answer has no score.")
+        return match
+
+
+def evaluate_matrix(resumes, jobs, concurrency=MATRIX_DEFAULT_CONCURRENCY, min_fit=MATRIX_MIN_FIT,
+                    top_k=None, use_cache=True):
+    """Score every (candidate_id, resume_text) in `resumes` against every job dict.
+
+    Each job is researched once. Pairs pruned by local TF-IDF pre-scoring get
+    status `pruned` and no LLM call. The remaining calls are issued job by job,
+    so prompts sharing a job's requirements prefix reach the provider together
+    and can hit its prompt cache.
+
+    Returns {"candidates", "jobs", "scores" (M x N, None where not scored), "cells"}.
+    """
+    resume_texts = [text for _, text in resumes]
+    fit = fit_matrix(resume_texts, jobs)
+    selected = select_pairs(fit, min_fit, top_k)
+    workers = max(1, min(concurrency, MATRIX_MAX_CONCURRENCY))
+
+    cells = [[{
+        "candidate_id": candidate_id,
+        "job_id": job_id_for(job),
+        "fit_score": round(float(fit[i][j]), 4),
+        "status": "pruned",
+        "score": None,
+    } for j, job in enumerate(jobs)] for i, (candidate_id, _) in enumerate(resumes)]
+
+    needed_jobs = sorted({j for _, j in selected})
+    gate = RateLimitGate()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="matrix") as pool:
+        research = {
+            j: pool.submit(get_job_requirements, jobs[j].get("Role", ""), jobs[j].get("Description", ""),
+                           jobs[j].get("Link"), use_cache)
+            for j in needed_jobs
+        }
+        futures = {}
+        for j in needed_jobs:
+            try:
+                job_requirements = research[j].result()
+            except Exception as e:
+                for i in range(len(resumes)):
+                    if (i, j) in selected:
+                        cells[i][j].update(status="error", error=f"Error researching job requirements: {e}")
+                continue
+            for i in range(len(resumes)):
+                if (i, j) in selected:
+                    futures[(i, j)] = pool.submit(_score_cell, gate, job_requirements, resume_texts[i], use_cache)
+
+        for (i, j), future in futures.items():
+            try:
+                cells[i][j].update(status="ok", **future.result())
+            except Exception as e:
+                cells[i][j].update(status="error", error=str(e))
+
+    return {
+        "candidates": [candidate_id for candidate_id, _ in resumes],
+        "jobs": [{"job_id": job_id_for(job), "Role": job.get("Role"), "Company": job.get("Company")} for job in jobs],
+        "scores": [[cell["score"] for cell in row] for row in cells],
+        "cells": [cell for row in cells for cell in row],
+    }
@@ -0,0 +1,173 @@
+import contextlib
+import functools
+import os
+import threading
+import time
+
+# Spans are exported only when tracing is switched on; the OpenTelemetry SDK is
+# imported on first use so the default configuration never loads it
+OTEL_TRACES_ENABLED = os.getenv("OTEL_TRACES_ENABLED", "0") == "1"
+OTEL_TRACES_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "otlp")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "resume-evaluator")
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+# USD per 1K (prompt, completion) tokens; models not listed are reported at zero cost
+MODEL_PRICES = {
+    "gpt-4-turbo-preview": (0.01, 0.03),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Counter:
+    """Monotonic counter with labels, rendered in the Prometheus text format."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in the Prometheus text format."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series["counts"]):
+                    lines.append(f"{self.name}_bucket{_label_text(key + (('le', f'{bound:g}'),))} {count}")
+                lines.append(f"{self.name}_bucket{_label_text(key + (('le', '+Inf'),))} {series['count']}")
+                lines.append(f"{self.name}_sum{_label_text(key)} {series['sum']:g}")
+                lines.append(f"{self.name}_count{_label_text(key)} {series['count']}")
+        return lines
+
+
+stage_duration = Histogram(
+    "pipeline_stage_duration_seconds", "Wall time spent in each pipeline stage.", STAGE_BUCKETS
+)
+llm_tokens = Counter("llm_tokens_total", "Prompt and completion tokens used by crew runs, per agent.")
+llm_tokens_per_run = Histogram("llm_tokens_per_run", "Total tokens used by a single crew run, per agent.", TOKEN_BUCKETS)
+llm_cost = Counter("llm_cost_usd_total", "Estimated LLM spend in USD, per agent.")
+llm_requests = Counter("llm_requests_total", "Successful LLM requests made by crew runs, per agent.")
+
+rate_limit_wait = Counter("rate_limit_wait_seconds_total", "Time spent waiting for a shared rate-limit token.")
+
+REGISTRY = [stage_duration, llm_tokens, llm_tokens_per_run, llm_cost, llm_requests, rate_limit_wait]
+
+
+@functools.lru_cache(maxsize=1)
+def _tracer():
+    """OpenTelemetry tracer, or None when tracing is disabled or cannot be set up."""
+    if not OTEL_TRACES_ENABLED:
+        return None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+        if OTEL_TRACES_EXPORTER == "console":
+            exporter = ConsoleSpanExporter()
+        else:
+            # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            exporter = OTLPSpanExporter()
+        provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        return trace.get_tracer("resume-evaluator")
+    except Exception as e:
+        print(f"OpenTelemetry tracing unavailable: {e}")
+        return None
+
+
+@contextlib.contextmanager
+def stage(name, **attributes):
+    """Time a pipeline stage into `pipeline_stage_duration_seconds` and, with
+    tracing enabled, record it as a span carrying `attributes`."""
+    tracer = _tracer()
+    span_context = tracer.start_as_current_span(name, attributes=attributes) if tracer else contextlib.nullcontext()
+    outcome = "ok"
+    start = time.perf_counter()
+    with span_context:
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            stage_duration.observe(time.perf_counter() - start, stage=name, outcome=outcome)
+
+
+def usage_cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = MODEL_PRICES.get(model or "", (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def record_token_usage(agent, model, usage):
+    """Add a crew run's UsageMetrics (CrewOutput.token_usage) to the per-agent counters."""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    llm_tokens.inc(prompt_tokens, agent=agent, type="prompt")
+    llm_tokens.inc(completion_tokens, agent=agent, type="completion")
+    llm_tokens_per_run.observe(prompt_tokens + completion_tokens, agent=agent)
+    llm_cost.inc(usage_cost(model, prompt_tokens, completion_tokens), agent=agent)
+    llm_requests.inc(getattr(usage, "successful_requests", 0) or 0, agent=agent)
+
+
+def render_metrics():
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,338 @@
+import asyncio
+import contextlib
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from agents import get_agent, CREW_VERBOSE
+from backends import RateLimiter, SharedLease
+from tasks import (
+    jd_research_task, evaluation_task, evaluation_stream_task, evaluation_repair_task, section_evaluation_task,
+    match_task, build_evaluation_prompt, build_structured_evaluation_prompt, build_match_prompt
+)
+from cache import LLMCache, make_cache_key
+from compaction import compact_resume, count_tokens, EVAL_PROMPT_TOKEN_BUDGET
+from requirements_store import RequirementsStore, job_fingerprint, job_fingerprint_for
+from metrics import stage, record_token_usage
+from reports import EvaluationReport, SectionAssessment, parse_report, validation_errors
+from skills import SkillIndex, skill_extractor, match_skills, skill_summary
+
+PREFETCH_SEARCH_REQUIREMENTS = os.getenv("PREFETCH_SEARCH_REQUIREMENTS", "0") == "1"
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", 2))
+# Prefetches beyond this many queued or running ones are skipped
+PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", 32))
+CREW_MAX_CONCURRENCY = int(os.getenv("CREW_MAX_CONCURRENCY", 8))
+CREW_EXECUTOR_THREADS = int(os.getenv("CREW_EXECUTOR_THREADS", 32))
+CREW_TIMEOUT_SECONDS = float(os.getenv("CREW_TIMEOUT_SECONDS", 300))
+# LLM requests per minute across all workers; 0 leaves them unthrottled
+OPENAI_REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", 0))
+
+llm_cache = LLMCache()
+requirements_store = RequirementsStore()
+skill_index = SkillIndex(skill_extractor, requirements_store)
+
+# Crews are synchronous, so async endpoints hand them to this pool instead of
+# running them on the event loop. The semaphore caps how many crews talk to the
+# LLM at once across every endpoint; cache hits never take a slot.
+crew_executor = ThreadPoolExecutor(max_workers=CREW_EXECUTOR_THREADS, thread_name_prefix="crew")
+crew_slots = threading.BoundedSemaphore(CREW_MAX_CONCURRENCY)
+# The semaphore is per worker process; this token bucket is shared by all of them.
+# Pipeline crews are single-step and tool-less, so each run costs one request.
+llm_limiter = RateLimiter("openai", OPENAI_REQUESTS_PER_MINUTE)
+# Prefetches get their own small pool so a burst of saves or searches cannot
+# queue ahead of request crews on crew_executor
+prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+prefetch_slots = threading.BoundedSemaphore(PREFETCH_MAX_PENDING)
+
+# One lock per job fingerprint so concurrent requests research a job only once.
+# The lock covers this process; the lease covers the other workers, and expires
+# in case its holder dies mid-research. Entries are [lock, holders and waiters]
+# and are removed when the count drops to zero.
+_research_locks = {}
+_research_locks_guard = threading.Lock()
+research_leases = SharedLease("research", CREW_TIMEOUT_SECONDS)
+RESEARCH_LEASE_POLL_SECONDS = 0.5
+
+
+def _llm_settings(agent):
+    """Model name and temperature of the agent's LLM, whichever wrapper it uses."""
+    llm = agent.llm
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None)
+    return model, getattr(llm, "temperature", None)
+
+
+def _task_cache_key(agent, task):
+    model, temperature = _llm_settings(agent)
+    return make_cache_key(
+        task.description,
+        model,
+        temperature,
+        role=agent.role,
+        expected_output=task.expected_output,
+    )
+
+
+def run_task(agent, task, use_cache=True, cache_if=None):
+    """Run `task` on a single-agent crew and return the raw text output.
+
+    Results are stored in the LLM cache; with `use_cache=False` the lookup is
+    skipped but the fresh result still replaces the cached one. Results that
+    the optional `cache_if` predicate rejects are returned but not cached.
+    """
+    key = _task_cache_key(agent, task)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    from crewai import Crew, Process
+
+    # Crews may run concurrently on worker threads, so each one gets its own
+    # copy of the agent instead of sharing executor state. The copy keeps the
+    # shared LLM; Agent.copy() would otherwise give it a private one.
+    llm = agent.llm
+    agent = agent.copy()
+    agent.llm = llm
+    task.agent = agent
+    crew = Crew(
+        agents=[agent],
+        tasks=[task],
+        verbose=CREW_VERBOSE,
+        process=Process.sequential
+    )
+    llm_limiter.acquire()
+    with crew_slots:
+        output = crew.kickoff()
+    record_token_usage(agent.role, _llm_settings(agent)[0], getattr(output, "token_usage", None))
+    # Extract the string from the CrewOutput object
+    result = getattr(output, 'raw', str(output))
+    if cache_if is None or cache_if(result):
+        llm_cache.set(key, result)
+    return result
+
+
+def stream_task(agent, task, use_cache=True):
+    """Yield the output of a single-step, tool-less task as the LLM produces it.
+
+    A crew only returns once the final answer is complete, so this sends the
+    agent's persona and the task prompt straight to the model with streaming
+    enabled. It shares cache entries with `run_task`; a cached result is
+    yielded as one chunk.
+    """
+    key = _task_cache_key(agent, task)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    import litellm
+
+    model, temperature = _llm_settings(agent)
+    messages = [
+        {"role": "system", "content": f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}"},
+        {"role": "user", "content": f"{task.description}\n\nThis is the expected criteria for your final answer: {task.expected_output}"},
+    ]
+    chunks = []
+    llm_limiter.acquire()
+    with crew_slots, stage("evaluation_stream"):
+        for chunk in litellm.completion(model=model, temperature=temperature, messages=messages, stream=True):
+            delta = chunk.choices[0].delta.content or ""
+            if delta:
+                chunks.append(delta)
+                yield delta
+    llm_cache.set(key, "".join(chunks))
+
+
+async def run_in_crew_executor(func, *args, timeout=CREW_TIMEOUT_SECONDS):
+    """Await a blocking pipeline call on the crew pool.
+
+    Raises asyncio.TimeoutError after `timeout` seconds. The worker thread keeps
+    running to completion, so its result still lands in the caches.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(crew_executor, functools.partial(func, *args))
+    return await asyncio.wait_for(future, timeout)
+
+
+def research_job(job_title, job_des, use_cache=True):
+    with stage("research_crew"):
+        return run_task(get_agent("job_researcher"), jd_research_task(job_title, job_des), use_cache)
+
+
+def _compact_to_fit(job_requirements, resume_text, empty_prompt, token_budget):
+    """Trim resume text so `empty_prompt` plus the resume fits `token_budget`."""
+    with stage("resume_compaction"):
+        prompt_overhead = count_tokens(empty_prompt)
+        compacted, stats = compact_resume(resume_text, job_requirements, max(token_budget - prompt_overhead, 0))
+    if stats["tokens_saved"] and CREW_VERBOSE:
+        print(f"Compacted resume: {stats['original_tokens']} -> {stats['compacted_tokens']} tokens")
+    return compacted, stats
+
+
+def compact_resume_for_evaluation(job_requirements, resume_text, token_budget=EVAL_PROMPT_TOKEN_BUDGET,
+                                  skill_check="", streamed=False):
+    """Trim resume text so the whole evaluation prompt fits `token_budget`.
+
+    The prompt is measured as sent: the structured one (the prose one when
+    `streamed`) including `skill_check`. Returns (resume_text, stats); see
+    compaction.compact_resume.
+    """
+    build_prompt = build_evaluation_prompt if streamed else build_structured_evaluation_prompt
+    return _compact_to_fit(job_requirements, resume_text, build_prompt(job_requirements, "", skill_check), token_budget)
+
+
+def compact_resume_for_match(job_requirements, resume_text, token_budget=EVAL_PROMPT_TOKEN_BUDGET):
+    """compact_resume_for_evaluation for the short matrix scoring prompt."""
+    return _compact_to_fit(job_requirements, resume_text, build_match_prompt(job_requirements, ""), token_budget)
+
+
+def match_resume_skills(resume_text, job_text):
+    """Local skill coverage of a job by a resume; missing skills ordered by demand across known jobs."""
+    with stage("skill_match"):
+        return match_skills(resume_text, job_text, skill_extractor, skill_index.demand())
+
+
+def skill_check_for(job_requirements, resume_text):
+    """Skill check section for the evaluation prompt (empty when no skills are recognised)."""
+    return skill_summary(match_resume_skills(resume_text, job_requirements))
+
+
+def run_structured_task(agent, task, output_model, use_cache=True):
+    """Run a task whose answer must validate as `output_model`.
+
+    An answer that does not validate gets one repair round trip; the repaired
+    JSON then replaces the cached answer. Only valid answers are cached, so a
+    failure is retried with the LLM next time. Raises ValueError if it still fails.
+    """
+    def valid(text):
+        try:
+            parse_report(text, output_model)
+        except ValueError:
+            return False
+        return True
+
+    raw = run_task(agent, task, use_cache, cache_if=valid)
+    try:
+        return parse_report(raw, output_model)
+    except ValueError as e:
+        errors = validation_errors(e)
+
+    with stage("evaluation_repair"):
+        repaired = run_task(agent, evaluation_repair_task(raw, errors, output_model), use_cache, cache_if=valid)
+    try:
+        result = parse_report(repaired, output_model)
+    except ValueError as e:
+        raise ValueError(f"Evaluation output did not match the report schema: {validation_errors(e)}") from e
+    llm_cache.set(_task_cache_key(agent, task), result.model_dump_json())
+    return result
+
+
+def evaluate_against_requirements(job_requirements, resume_text, use_cache=True, skill_check=None):
+    """Structured EvaluationReport for a resume; see run_structured_task.
+
+    Pass the `skill_check` of the full resume when `resume_text` is compacted;
+    by default it is computed from `resume_text`.
+    """
+    if skill_check is None:
+        skill_check = skill_check_for(job_requirements, resume_text)
+    task = evaluation_task(job_requirements, resume_text, skill_check)
+    with stage("evaluation_crew"):
+        return run_structured_task(get_agent("resume_evaluator"), task, EvaluationReport, use_cache)
+
+
+def evaluate_section(job_requirements, heading, section_text, use_cache=True):
+    """SectionAssessment of one resume section against the job requirements."""
+    task = section_evaluation_task(job_requirements, heading, section_text)
+    with stage("section_crew"):
+        return run_structured_task(get_agent("resume_evaluator"), task, SectionAssessment, use_cache)
+
+
+def score_match(job_requirements, resume_text, use_cache=True, cache_if=None):
+    """Raw JSON-ish answer of the short matrix scoring prompt (see tasks.build_match_prompt)."""
+    with stage("match_crew"):
+        return run_task(get_agent("resume_evaluator"), match_task(job_requirements, resume_text), use_cache, cache_if)
+
+
+def stream_evaluation(job_requirements, resume_text, use_cache=True, skill_check=None):
+    if skill_check is None:
+        skill_check = skill_check_for(job_requirements, resume_text)
+    return stream_task(
+        get_agent("resume_evaluator"), evaluation_stream_task(job_requirements, resume_text, skill_check), use_cache
+    )
+
+
+@contextlib.contextmanager
+def _research_lock(fingerprint):
+    with _research_locks_guard:
+        entry = _research_locks.setdefault(fingerprint, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _research_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _research_locks[fingerprint]
+
+
+def get_job_requirements(job_title, job_des, job_link=None, use_cache=True):
+    """Requirements report for a job, researched at most once per job fingerprint."""
+    fingerprint = job_fingerprint(job_title, job_des, job_link)
+    if use_cache:
+        requirements = requirements_store.get(fingerprint)
+        if requirements is not None:
+            return requirements
+
+    with _research_lock(fingerprint):
+        while True:
+            # Another request or worker may have finished the research while we waited
+            if use_cache:
+                requirements = requirements_store.get(fingerprint)
+                if requirements is not None:
+                    return requirements
+            lease = research_leases.acquire(fingerprint)
+            if lease:
+                break
+            time.sleep(RESEARCH_LEASE_POLL_SECONDS)
+        try:
+            requirements = research_job(job_title, job_des, use_cache)
+            requirements_store.put(fingerprint, job_title, job_des, requirements)
+            return requirements
+        finally:
+            research_leases.release(fingerprint, lease)
+
+
+def register_jobs(jobs):
+    """Index jobs returned by a search so their requirements can be reused later."""
+    for job in jobs:
+        requirements_store.register(job_fingerprint_for(job), job.get("Role", ""), job.get("Description", ""))
+
+
+def _prefetch(job):
+    try:
+        get_job_requirements(job.get("Role", ""), job.get("Description", ""), job.get("Link"))
+    except Exception as e:
+        print(f"Requirements prefetch failed for {job.get('Link')}: {e}")
+    finally:
+        prefetch_slots.release()
+
+
+def prefetch_requirements(job):
+    """Research a job ahead of the first evaluation without blocking the caller.
+
+    Runs on the prefetch pool rather than as a request background task, so it
+    neither holds a request-handling thread nor keeps the client's connection
+    open while the crew runs. Returns the future, or None when
+    PREFETCH_MAX_PENDING prefetches are already pending and this one is
+    skipped; the job is then researched on its first evaluation.
+    """
+    if not prefetch_slots.acquire(blocking=False):
+        return None
+    try:
+        return prefetch_executor.submit(_prefetch, job)
+    except BaseException:
+        prefetch_slots.release()
+        raise
@@ -0,0 +1,58 @@
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOP_WORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can could do does for from
+had has have having he her his how i if in into is it its just may more most must my no not of on
+or our out over own she should so some such than that the their them then there these they this
+those through to too under up us very was we were what when where which while who will with would
+you your
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOP_WORDS]
+
+
+def tfidf_matrix(documents):
+    """L2-normalized TF-IDF rows (sublinear tf, smoothed idf) for `documents`."""
+    tokenized = [tokenize(document) for document in documents]
+    vocabulary = {}
+    for tokens in tokenized:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+
+    counts = np.zeros((len(documents), max(len(vocabulary), 1)), dtype=np.float32)
+    for row, tokens in enumerate(tokenized):
+        if tokens:
+            columns, frequencies = np.unique([vocabulary[token] for token in tokens], return_counts=True)
+            counts[row, columns] = frequencies
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1.0
+    weights = np.where(counts > 0, 1.0 + np.log(np.maximum(counts, 1.0)), 0.0) * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights / np.where(norms == 0, 1.0, norms)
+
+
+def similarity_scores(query, documents):
+    """Cosine similarity of `query` against each document, in document order."""
+    if not documents:
+        return np.zeros(0, dtype=np.float32)
+    matrix = tfidf_matrix([query] + list(documents))
+    return matrix[1:] @ matrix[0]
+
+
+def job_text(job):
+    return f"{job.get('Role', '')}\n{job.get('Description', '')}"
+
+
+def rank_jobs(resume_text, jobs, top_k=None):
+    """Jobs sorted by TF-IDF fit against the resume, each with a `FitScore` in [0, 1]."""
+    scores = similarity_scores(resume_text, [job_text(job) for job in jobs])
+    order = np.argsort(-scores, kind="stable")
+    if top_k is not None:
+        order = order[:top_k]
+    return [{**jobs[i], "FitScore": round(float(scores[i]), 4)} for i in order]
@@ -0,0 +1,68 @@
+import json
+import re
+from typing import List
+
+from pydantic import BaseModel, Field, ValidationError
+
+
+class EvaluationReport(BaseModel):
+    """Structured resume evaluation returned by the evaluation crew."""
+    overall_score: float = Field(ge=0, le=10, description="Overall fit, 0 to 10")
+    match_assessment: str = Field(description="How well the resume matches the job requirements")
+    matched_skills: List[str] = Field(default_factory=list, description="Required skills the resume shows")
+    missing_skills: List[str] = Field(default_factory=list, description="Required skills the resume lacks")
+    strengths: List[str] = Field(default_factory=list)
+    weaknesses: List[str] = Field(default_factory=list)
+    ats_tips: List[str] = Field(default_factory=list, description="How the resume can rank better in ATS systems")
+    recommendations: List[str] = Field(default_factory=list, description="Specific improvements for this job")
+
+
+class SectionAssessment(BaseModel):
+    """Assessment of one resume section, used by incremental re-evaluation."""
+    score: float = Field(ge=0, le=10, description="How well this section supports the application, 0 to 10")
+    matched_skills: List[str] = Field(default_factory=list)
+    missing_skills: List[str] = Field(default_factory=list)
+    strengths: List[str] = Field(default_factory=list)
+    weaknesses: List[str] = Field(default_factory=list)
+    recommendations: List[str] = Field(default_factory=list)
+
+
+def parse_report(text, model=EvaluationReport):
+    """Validate an LLM answer as an EvaluationReport (or another `model`).
+
+    Accepts a bare JSON object or one wrapped in prose or a code fence; raises
+    ValueError (a ValidationError for schema problems) when it does not fit.
+    """
+    match = re.search(r"\{.*\}", text or "", flags=re.DOTALL)
+    if match is None:
+        raise ValueError("No JSON object found in the evaluation output.")
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Evaluation output is not valid JSON: {e}") from e
+    return model.model_validate(data)
+
+
+def validation_errors(exc):
+    """Short description of why parsing failed, for the repair prompt."""
+    if isinstance(exc, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, error['loc'])) or 'root'}: {error['msg']}" for error in exc.errors())
+    return str(exc)
+
+
+def _bullets(items):
+    return "\n".join(f"- {item}" for item in items) if items else "- None noted"
+
+
+def render_markdown(report):
+    """The report in the section layout the prose evaluator used, for display."""
+    return "\n\n".join([
+        f"**Overall Score (out of 10):** {report.overall_score:g}",
+        f"**Match Assessment**\n{report.match_assessment}",
+        f"**Matched Skills**\n{_bullets(report.matched_skills)}",
+        f"**Missing Skills**\n{_bullets(report.missing_skills)}",
+        f"**Strengths**\n{_bullets(report.strengths)}",
+        f"**Weaknesses**\n{_bullets(report.weaknesses)}",
+        f"**ATS Optimization Tips**\n{_bullets(report.ats_tips)}",
+        f"**Improvement Recommendations**\n{_bullets(report.recommendations)}",
+    ])
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from cache import normalize_prompt
+
+REQUIREMENTS_DB_PATH = os.getenv("REQUIREMENTS_DB_PATH", "job_requirements.db")
+
+
+def job_fingerprint(job_title, job_des, job_link=None):
+    """Stable identifier for a job posting.
+
+    Adzuna links carry tracking parameters that change between searches, so only
+    the path of the link is used. Jobs without a usable link fall back to a hash
+    of the normalized title and description.
+    """
+    if job_link and job_link != "#":
+        parts = urlsplit(job_link)
+        return "link:" + hashlib.sha256(f"{parts.netloc}{parts.path}".encode("utf-8")).hexdigest()
+    text = f"{normalize_prompt(job_title).lower()}\n{normalize_prompt(job_des)}"
+    return "desc:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def job_fingerprint_for(job):
+    """Fingerprint of a job dict as returned by the job search tool."""
+    return job_fingerprint(job.get("Role", ""), job.get("Description", ""), job.get("Link"))
+
+
+class RequirementsStore:
+    """Per-job index of researched requirements reports, keyed by job fingerprint."""
+
+    def __init__(self, path=REQUIREMENTS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS job_requirements (
+                fingerprint TEXT PRIMARY KEY,
+                job_title TEXT NOT NULL,
+                job_des TEXT NOT NULL,
+                requirements TEXT,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def register(self, fingerprint, job_title, job_des):
+        """Record a job without researching it; existing reports are kept."""
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO job_requirements (fingerprint, job_title, job_des, updated_at)
+                VALUES (?, ?, ?, ?) ON CONFLICT (fingerprint) DO NOTHING""",
+                (fingerprint, job_title, job_des, time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, fingerprint):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT requirements FROM job_requirements WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, fingerprint, job_title, job_des, requirements):
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO job_requirements
+                (fingerprint, job_title, job_des, requirements, updated_at) VALUES (?, ?, ?, ?, ?)""",
+                (fingerprint, job_title, job_des, requirements, time.time()),
+            )
+            self._conn.commit()
+
+    def changed_since(self, updated_at):
+        """Jobs registered or researched after `updated_at`, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT fingerprint, job_title, job_des, requirements, updated_at FROM job_requirements
+                WHERE updated_at > ? ORDER BY updated_at""",
+                (updated_at,),
+            ).fetchall()
+        return [
+            {"fingerprint": row[0], "job_title": row[1], "job_des": row[2], "requirements": row[3], "updated_at": row[4]}
+            for row in rows
+        ]
+
+    def stats(self):
+        with self._lock:
+            jobs, researched = self._conn.execute(
+                "SELECT COUNT(*), COUNT(requirements) FROM job_requirements"
+            ).fetchone()
+        return {"jobs": jobs, "researched": researched}
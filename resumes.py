@@ -0,0 +1,124 @@
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+from compaction import PAGE_BREAK
+from metrics import stage
+
+RESUME_DB_PATH = os.getenv("RESUME_DB_PATH", "resumes.db")
+# Smaller documents are parsed in-process; pool start-up would cost more than it saves
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 8))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def resume_id_for(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _extract_page_range(data, start, stop):
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return [doc[number].get_text() for number in range(start, stop)]
+
+
+def _get_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # Forking a process that runs server threads can copy held locks
+            # into the child, so workers are started fresh
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pdf_pool
+
+
+def extract_pdf_text(data):
+    """Text of an in-memory PDF, splitting long documents across worker processes.
+
+    Returns (text, page_count). Raises ValueError if the bytes are not a PDF.
+    """
+    try:
+        doc = fitz.open(stream=data, filetype="pdf")
+    except (fitz.FileDataError, RuntimeError) as e:
+        raise ValueError(f"Could not read PDF: {e}") from e
+    with doc:
+        page_count = doc.page_count
+        if page_count < PDF_PARALLEL_MIN_PAGES or PDF_WORKERS < 2:
+            return PAGE_BREAK.join(page.get_text() for page in doc), page_count
+
+    chunk = -(-page_count // PDF_WORKERS)
+    ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    pool = _get_pdf_pool()
+    futures = [pool.submit(_extract_page_range, data, start, stop) for start, stop in ranges]
+    return PAGE_BREAK.join(text for future in futures for text in future.result()), page_count
+
+
+class ResumeStore:
+    """Parsed resume text keyed by the SHA-256 of the uploaded file."""
+
+    def __init__(self, path=RESUME_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS resumes (
+                resume_id TEXT PRIMARY KEY,
+                filename TEXT,
+                page_count INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, resume_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename, page_count, text FROM resumes WHERE resume_id = ?", (resume_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"resume_id": resume_id, "filename": row[0], "page_count": row[1], "text": row[2]}
+
+    def get_text(self, resume_id):
+        resume = self.get(resume_id)
+        return resume["text"] if resume else None
+
+    def put(self, resume_id, filename, page_count, text):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resumes (resume_id, filename, page_count, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                (resume_id, filename, page_count, text, time.time()),
+            )
+            self._conn.commit()
+
+    def delete(self, resume_id):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM resumes WHERE resume_id = ?", (resume_id,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def ingest(self, data, filename=None):
+        """Parse and store a PDF unless the same file was uploaded before.
+
+        Returns (resume dict, whether it was already stored).
+        """
+        resume_id = resume_id_for(data)
+        existing = self.get(resume_id)
+        if existing is not None:
+            return existing, True
+        with stage("pdf_parse"):
+            text, page_count = extract_pdf_text(data)
+        self.put(resume_id, filename, page_count, text)
+        return {"resume_id": resume_id, "filename": filename, "page_count": page_count, "text": text}, False
+
+
+resume_store = ResumeStore()
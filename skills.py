@@ -0,0 +1,189 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+# Optional JSON file ({"Skill": ["alias", ...]}) merged into the built-in vocabulary
+SKILLS_VOCABULARY_PATH = os.getenv("SKILLS_VOCABULARY_PATH")
+SKILL_INDEX_REFRESH_SECONDS = float(os.getenv("SKILL_INDEX_REFRESH_SECONDS", 30))
+
+# Canonical skill -> aliases matched in text (the canonical name always matches).
+# Matching ignores case except for the terms in CASE_SENSITIVE_TERMS.
+SKILL_VOCABULARY = {
+    # Languages
+    "Python": [], "Java": [], "JavaScript": ["js", "ecmascript"], "TypeScript": [], "Go": ["golang"],
+    "Rust": [], "C": [], "C++": ["cpp"], "C#": ["csharp", "c sharp"], "Ruby": [], "PHP": [], "Scala": [],
+    "Kotlin": [], "Swift": [], "R": [], "MATLAB": [], "SQL": [], "Bash": ["shell scripting"],
+    # Web and backend
+    "HTML": ["html5"], "CSS": ["css3"], "React": ["react.js", "reactjs"], "Angular": ["angularjs"],
+    "Vue": ["vue.js", "vuejs"], "Node.js": ["nodejs", "Node"], "Django": [], "Flask": [], "FastAPI": [],
+    "Spring": ["spring boot"], "Ruby on Rails": ["rails"], ".NET": ["dotnet", "asp.net"], "GraphQL": [],
+    "REST APIs": ["REST", "restful", "rest api", "restful apis"], "gRPC": [], "Microservices": ["microservice"],
+    # Data
+    "PostgreSQL": ["postgres"], "MySQL": [], "MongoDB": ["mongo"], "Redis": [], "Elasticsearch": [],
+    "Cassandra": [], "DynamoDB": [], "Snowflake": [], "BigQuery": [], "Redshift": [], "Databricks": [],
+    "Apache Spark": ["Spark", "pyspark"], "Hadoop": [], "Kafka": ["apache kafka"], "Airflow": ["apache airflow"],
+    "dbt": [], "ETL": ["elt"], "Data Warehousing": ["data warehouse"], "Data Modeling": ["data modelling"],
+    "Pandas": [], "NumPy": [], "Tableau": [], "Power BI": ["powerbi"], "Looker": [], "Excel": ["ms excel"],
+    # ML and AI
+    "Machine Learning": ["ML"], "Deep Learning": [], "NLP": ["natural language processing"],
+    "Computer Vision": [], "TensorFlow": [], "PyTorch": [], "scikit-learn": ["sklearn"], "LLMs": ["llm"],
+    "Statistics": ["statistical analysis"], "A/B Testing": ["ab testing", "experimentation"], "MLOps": [],
+    # Cloud and infrastructure
+    "AWS": ["amazon web services"], "Azure": ["microsoft azure"], "GCP": ["google cloud", "google cloud platform"],
+    "Docker": [], "Kubernetes": ["k8s"], "Terraform": [], "Ansible": [], "Linux": [],
+    "CI/CD": ["continuous integration", "continuous delivery"], "Jenkins": [], "GitHub Actions": [],
+    "Git": [], "Prometheus": [], "Grafana": [], "Networking": ["tcp/ip"],
+    # Practices and roles
+    "Agile": [], "Scrum": [], "Kanban": [], "Jira": [], "Test Automation": ["automated testing"],
+    "Unit Testing": [], "System Design": [], "Distributed Systems": [], "Security": ["cybersecurity"],
+    "Project Management": [], "Product Management": [], "Stakeholder Management": [],
+    "Communication": ["communication skills"], "Leadership": ["team leadership"], "Mentoring": ["mentorship"],
+    "Problem Solving": ["problem-solving"], "Figma": [], "UX Design": ["user experience"],
+    "SEO": [], "Salesforce": [], "SAP": [],
+    # Certifications
+    "AWS Certified Solutions Architect": ["aws solutions architect"], "AWS Certified Developer": [],
+    "Azure Administrator": ["az-104"], "Google Professional Cloud Architect": [],
+    "Certified Kubernetes Administrator": ["cka"], "PMP": ["project management professional"],
+    "Certified ScrumMaster": ["csm"], "CISSP": [], "CompTIA Security+": ["security+"],
+    "CPA": ["certified public accountant"], "CFA": [], "ITIL": [], "Six Sigma": ["lean six sigma"],
+}
+
+# Short or everyday words that only count as skills when written exactly like this
+CASE_SENSITIVE_TERMS = {"C", "R", "Go", "Rust", "Swift", "Excel", "Spark", "Node", "REST", "ML", "SAP"}
+
+# Characters that count as part of a term, so "C" does not match inside "C++" or "CSS"
+_TERM_BEFORE = r"A-Za-z0-9+#.&"
+_TERM_AFTER = r"A-Za-z0-9+#&"
+
+
+def _trie_pattern(terms):
+    """Regex alternation with shared prefixes factored out, like a compiled trie."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        if list(node) == [""]:
+            return ""
+        ending = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{pattern})?" if ending else pattern
+
+    return build(trie)
+
+
+def _compile(terms, flags=0):
+    return re.compile(rf"(?<![{_TERM_BEFORE}])({_trie_pattern(terms)})(?![{_TERM_AFTER}])", flags)
+
+
+class SkillExtractor:
+    """Finds vocabulary skills in text with compiled regex tries (one
+    case-insensitive, one for CASE_SENSITIVE_TERMS)."""
+
+    def __init__(self, vocabulary):
+        self._canonical = {}
+        self._exact = {}
+        for skill, aliases in vocabulary.items():
+            for term in [skill, *aliases]:
+                if term in CASE_SENSITIVE_TERMS:
+                    self._exact.setdefault(term, skill)
+                else:
+                    self._canonical.setdefault(term.lower(), skill)
+        self._pattern = _compile(self._canonical, re.IGNORECASE)
+        self._exact_pattern = _compile(self._exact)
+
+    def extract(self, text):
+        """Canonical names of every skill mentioned in `text`."""
+        text = text or ""
+        found = {self._canonical[match.group(1).lower()] for match in self._pattern.finditer(text)}
+        found.update(self._exact[match.group(1)] for match in self._exact_pattern.finditer(text))
+        return found
+
+
+def load_vocabulary(path=SKILLS_VOCABULARY_PATH):
+    vocabulary = {skill: list(aliases) for skill, aliases in SKILL_VOCABULARY.items()}
+    if path:
+        with open(path) as f:
+            for skill, aliases in json.load(f).items():
+                vocabulary.setdefault(skill, []).extend(aliases)
+    return vocabulary
+
+
+class SkillIndex:
+    """How many known jobs ask for each skill, built from the job descriptions
+    and requirements reports in the requirements store.
+
+    Refreshes are incremental (only jobs changed since the last one are
+    re-extracted) and happen at most every `refresh_seconds`.
+    """
+
+    def __init__(self, extractor, store, refresh_seconds=SKILL_INDEX_REFRESH_SECONDS):
+        self.extractor = extractor
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._job_skills = {}
+        self._demand = Counter()
+        self._seen_until = 0.0
+        self._refreshed_at = None
+
+    def demand(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._refreshed_at is None or now - self._refreshed_at >= self.refresh_seconds:
+                self._refresh()
+                self._refreshed_at = now
+            return self._demand
+
+    def _refresh(self):
+        for job in self.store.changed_since(self._seen_until):
+            skills = self.extractor.extract(f"{job['job_title']}\n{job['job_des']}\n{job['requirements'] or ''}")
+            self._demand.subtract(self._job_skills.get(job["fingerprint"], ()))
+            self._demand.update(skills)
+            self._job_skills[job["fingerprint"]] = skills
+            self._seen_until = max(self._seen_until, job["updated_at"])
+        self._demand = +self._demand
+
+    def stats(self):
+        with self._lock:
+            return {"jobs": len(self._job_skills), "skills": len(self._demand)}
+
+
+def match_skills(resume_text, job_text, extractor, demand=None):
+    """Coverage of the job's skills by the resume.
+
+    Missing skills are ordered by how many known jobs ask for them (`demand`),
+    so the most marketable gaps come first.
+    """
+    required = extractor.extract(job_text)
+    present = extractor.extract(resume_text)
+    matched = required & present
+    demand = demand or {}
+    return {
+        "required_skills": sorted(required),
+        "matched_skills": sorted(matched),
+        "missing_skills": sorted(required - present, key=lambda skill: (-demand.get(skill, 0), skill)),
+        "additional_skills": sorted(present - required),
+        "coverage": round(len(matched) / len(required), 4) if required else None,
+    }
+
+
+def skill_summary(match):
+    """Skill check lines for the evaluation prompt."""
+    if not match["required_skills"]:
+        return ""
+    return (
+        f"Local skill check (exact keyword matches, coverage {match['coverage']:.0%}):\n"
+        f"    Matched: {', '.join(match['matched_skills']) or 'none'}\n"
+        f"    Missing: {', '.join(match['missing_skills']) or 'none'}"
+    )
+
+
+skill_extractor = SkillExtractor(load_vocabulary())
@@ -1,22 +1,47 @@
 # streamlit_app.py
 import streamlit as st
 import requests
-import tempfile
-import os
-import fitz  # PyMuPDF
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import time
+import os
+import uuid
 
 # Configure page
 st.set_page_config(layout="wide", page_title="AI Career Guide")
 
 # API URLs
-API_SEARCH_URL = "http://127.0.0.1:8000/search_jobs"
-API_SAVE_URL = "http://127.0.0.1:8000/save_job"
-API_GET_DESCRIPTION_URL = "http://127.0.0.1:8000/get_saved_job_description"
-API_EVALUATE_URL = "http://localhost:8000/evaluate"
+API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
+API_SEARCH_URL = f"{API_BASE_URL}/search_jobs"
+API_SAVE_URL = f"{API_BASE_URL}/save_job"
+API_RANK_URL = f"{API_BASE_URL}/rank_jobs"
+API_RESUMES_URL = f"{API_BASE_URL}/resumes"
+API_EVALUATIONS_URL = f"{API_BASE_URL}/evaluations"
+API_EVALUATE_STREAM_URL = f"{API_BASE_URL}/evaluate/stream"
+
+# (connect, read) timeouts in seconds; streamed evaluations may take minutes to finish
+REQUEST_TIMEOUT = (3.05, 30)
+STREAM_TIMEOUT = (3.05, 300)
+POLL_INTERVAL_SECONDS = 2
+SEARCH_CACHE_TTL_SECONDS = 600
+
+# One pooled HTTP session shared by every script run and browser session
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    # Only idempotent calls are retried; connection errors retry for any method
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+http = get_http_session()
 
 # Initialize session state variables
+if "user_id" not in st.session_state:
+    # Keeps this browser session's saved jobs separate from other users
+    st.session_state["user_id"] = uuid.uuid4().hex
 if "saved_job" not in st.session_state:
     st.session_state["saved_job"] = None
 if "job_results" not in st.session_state:
@@ -25,26 +50,63 @@ if "job_desc" not in st.session_state:
     st.session_state["job_desc"] = None
 if "evaluation_result" not in st.session_state:
     st.session_state["evaluation_result"] = None
+if "evaluation_id" not in st.session_state:
+    st.session_state["evaluation_id"] = None
 
-# Function to extract text from PDF
-def extract_text_from_pdf(pdf_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmpfile:
-        tmpfile.write(pdf_file.getvalue())
-        pdf_path = tmpfile.name
+# Function to upload a resume PDF to the API, which parses it and returns a resume id
+def upload_resume(pdf_file):
+    resume_ids = st.session_state.setdefault("resume_ids", {})
+    if pdf_file.file_id in resume_ids:
+        return resume_ids[pdf_file.file_id]
     
-    text = ""
     try:
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            text += page.get_text()
-        doc.close()
+        response = http.post(
+            API_RESUMES_URL,
+            files={"file": (pdf_file.name, pdf_file.getvalue(), "application/pdf")},
+            timeout=REQUEST_TIMEOUT
+        )
     except Exception as e:
-        st.error(f"Error extracting text from PDF: {e}")
-    finally:
-        if os.path.exists(pdf_path):
-            os.remove(pdf_path)
+        st.error(f"Failed to upload resume: {e}")
+        return None
+    if response.status_code != 200:
+        st.error(f"Error reading PDF: {response.status_code} - {response.text}")
+        return None
     
-    return text
+    resume = response.json()
+    if not resume["characters"]:
+        st.error("Could not extract text from the PDF. Please try another file.")
+        return None
+    resume_ids[pdf_file.file_id] = resume["resume_id"]
+    return resume["resume_id"]
+
+# Function to remove the resumes this session uploaded from the API's store
+def delete_uploaded_resumes():
+    resume_ids = st.session_state.get("resume_ids", {})
+    for file_id, resume_id in list(resume_ids.items()):
+        try:
+            response = http.delete(f"{API_RESUMES_URL}/{resume_id}", timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            st.error(f"Failed to delete resume: {e}")
+            return
+        if response.status_code not in (200, 404):
+            st.error(f"Error deleting resume: {response.status_code} - {response.text}")
+            return
+        del resume_ids[file_id]
+    st.success("Your uploaded resumes were deleted from the server.")
+
+# Search results keyed by the query, so repeating a search skips the backend
+@st.cache_data(ttl=SEARCH_CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_job_results(role, location, num_results):
+    response = http.post(
+        API_SEARCH_URL,
+        json={"role": role, "location": location, "num_results": num_results},
+        timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    job_results = response.json().get("results", [])
+    if not isinstance(job_results, list):
+        raise ValueError("Unexpected response format. Expected a list of job results.")
+    return job_results
 
 # Function for searching jobs
 def search_jobs():
@@ -52,51 +114,122 @@ def search_jobs():
         st.warning("Please enter both a job title and location.")
         return
     
-    payload = {
-        "role": st.session_state.job_title, 
-        "location": st.session_state.job_location, 
-        "num_results": st.session_state.num_results
-    }
-    
     with st.spinner("Searching for jobs..."):
-        response = requests.post(API_SEARCH_URL, json=payload)
-        
-        if response.status_code == 200:
-            try:
-                job_results = response.json().get("results", [])
-                if isinstance(job_results, list):
-                    st.session_state["job_results"] = job_results  
-                    st.success("Job search complete!")
-                else:
-                    st.error("Unexpected response format. Expected a list of job results.")
-            except Exception as e:
-                st.error(f"Error processing API response: {e}")
-        else:
-            st.error(f"Error: {response.status_code} - {response.text}")
+        try:
+            st.session_state["job_results"] = fetch_job_results(
+                st.session_state.job_title.strip(),
+                st.session_state.job_location.strip(),
+                st.session_state.num_results
+            )
+            st.success("Job search complete!")
+        except requests.exceptions.HTTPError as e:
+            st.error(f"Error: {e.response.status_code} - {e.response.text}")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            st.error(f"Error processing API response: {e}")
 
 # Function to save a job
 def save_job(job_index):
     job = st.session_state["job_results"][job_index]
     try:
-        response = requests.post(API_SAVE_URL, json={"job": job})
+        response = http.post(
+            API_SAVE_URL,
+            json={"job": job, "user_id": st.session_state["user_id"]},
+            timeout=REQUEST_TIMEOUT
+        )
         if response.status_code == 200:
-            st.session_state["saved_job"] = job  
+            st.session_state["saved_job"] = job
+            st.session_state["job_desc"] = None
             st.success("Job saved successfully!")
         else:
             st.error(f"Error saving job: {response.status_code}")
     except Exception as e:
         st.error(f"Failed to save job: {e}")
 
-# Function to get job description
-def get_job_description():
+# Function to sort search results by fit with the uploaded resume
+def rank_job_results():
+    if not st.session_state.get("resume_file"):
+        st.warning("Upload your resume first to rank jobs by fit.")
+        return
+    
+    resume_id = upload_resume(st.session_state.resume_file)
+    if not resume_id:
+        return
     try:
-        desc_response = requests.get(API_GET_DESCRIPTION_URL)
-        if desc_response.status_code == 200:
-            st.session_state["job_desc"] = desc_response.json()
-        else:
-            st.warning("No job description found.")
-    except Exception as e:
-        st.error(f"Failed to fetch job description: {e}")
+        # Drop scores from an earlier ranking so re-ranking the same jobs hits the cache
+        jobs = [{key: value for key, value in job.items() if key != "FitScore"} for job in st.session_state["job_results"]]
+        st.session_state["job_results"] = fetch_ranked_jobs(resume_id, jobs)
+    except requests.exceptions.HTTPError as e:
+        st.error(f"Error ranking jobs: {e.response.status_code}")
+    except requests.exceptions.RequestException as e:
+        st.error(f"Failed to rank jobs: {e}")
+
+# Ranking depends only on the resume and the job list, so it is cached on both
+@st.cache_data(ttl=SEARCH_CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_ranked_jobs(resume_id, jobs):
+    response = http.post(API_RANK_URL, json={"resume_id": resume_id, "jobs": jobs}, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()["results"]
+
+# The saved job already carries its description, so no backend call is needed
+def get_job_description():
+    saved_job = st.session_state["saved_job"]
+    st.session_state["job_desc"] = {
+        "Role": saved_job["Role"],
+        "Company": saved_job["Company"],
+        "Description": saved_job.get("Description", "No description available")
+    }
+
+# Read server-sent events from a streaming response as (event, data) pairs
+def iter_sse(response):
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:") and event:
+            yield event, json.loads(line[len("data:"):])
+            event = None
+
+# Stream an evaluation from the API, rendering requirements and tokens as they arrive
+def stream_evaluation(request_data):
+    requirements_placeholder = st.empty()
+    evaluation_placeholder = st.empty()
+    job_requirements = ""
+    evaluation_text = ""
+    
+    with http.post(API_EVALUATE_STREAM_URL, json=request_data, stream=True, timeout=STREAM_TIMEOUT) as response:
+        if response.status_code != 200:
+            st.error(f"Error from API: {response.status_code} - {response.text}")
+            return None
+        
+        for event, data in iter_sse(response):
+            if event == "requirements":
+                job_requirements = data["text"]
+                with requirements_placeholder.container():
+                    with st.expander("Job Requirements Analysis", expanded=False):
+                        st.markdown(job_requirements)
+            elif event == "token":
+                evaluation_text += data["text"]
+                evaluation_placeholder.markdown(evaluation_text)
+            elif event == "error":
+                st.error(f"Error from API: {data['detail']}")
+                return None
+    
+    return {"job_requirements": job_requirements, "evaluation_result": evaluation_text}
+
+# Queue an evaluation on the backend; progress is polled by evaluation_progress()
+def submit_evaluation(request_data):
+    response = http.post(API_EVALUATIONS_URL, json=request_data, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 202:
+        st.error(f"Error from API: {response.status_code} - {response.text}")
+        return
+    st.session_state["evaluation_id"] = response.json()["id"]
+    st.session_state["evaluation_result"] = None
+
+EVALUATION_STATUS_TEXT = {
+    "queued": "Waiting for a free evaluator...",
+    "researching": "Researching the job requirements...",
+    "evaluating": "Evaluating your resume against the requirements...",
+}
 
 # Function to evaluate resume
 def evaluate_resume():
@@ -110,38 +243,41 @@ def evaluate_resume():
     
     job_title = st.session_state.saved_job['Role']
     
-    with st.spinner("Analyzing your resume... This may take a minute or two."):
-        # Extract text from resume
-        resume_text = extract_text_from_pdf(st.session_state.resume_file)
+    with st.spinner("Reading your resume..."):
+        resume_id = upload_resume(st.session_state.resume_file)
+        
+    if not resume_id:
+        return
+    
+    try:
+        # The saved job carries its own description
+        job_description = st.session_state.saved_job.get("Description") or "No description available"
+        
+        # Prepare request data
+        request_data = {
+            "job_title": job_title,
+            "job_des": job_description,
+            "resume_id": resume_id,
+            "job_link": st.session_state.saved_job.get("Link")
+        }
         
-        if not resume_text:
-            st.error("Could not extract text from the PDF. Please try another file.")
+        if not st.session_state.get("stream_report"):
+            # Run in the background; the page stays usable while it is polled
+            submit_evaluation(request_data)
             return
         
-        try:
-            # Get job description
-            job_description = "No description available"
-            if st.session_state.job_desc:
-                job_description = st.session_state.job_desc.get("Description", "No description available")
-            
-            # Prepare request data
-            request_data = {
-                "job_title": job_title,
-                "job_des": job_description,
-                "resume_text": resume_text
-            }
-            
-            # Send request to API
-            response = requests.post(API_EVALUATE_URL, json=request_data)
-            
-            if response.status_code == 200:
-                st.session_state["evaluation_result"] = response.json()
-            else:
-                st.error(f"Error from API: {response.status_code} - {response.text}")
+        # Stream the evaluation from the API
+        with st.spinner("Evaluating your resume... The report appears below as it is written."):
+            result = stream_evaluation(request_data)
         
-        except Exception as e:
-            st.error(f"Error connecting to the API: {str(e)}")
-            st.info("Make sure the backend server is running at the correct address.")
+        if result:
+            st.session_state["evaluation_result"] = result
+            # Re-run so the finished report is rendered once, with the download button
+            st.rerun()
+    
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error connecting to the API: {str(e)}")
+        st.info("Make sure the backend server is running at the correct address.")
 
 # Main app header
 st.markdown("## 🚀 **AI-Powered Career Guide**")
@@ -156,7 +292,7 @@ with st.expander("About this tool"):
     3. It evaluates your resume against these requirements.  
     4. You receive personalized feedback and job-specific CV optimization tips.   
 
-    **Privacy note:** Your resume data is only used for analysis and is not stored permanently.  
+    **Privacy note:** Your resume data is only used for analysis. Uploaded resumes are kept on the server so they can be evaluated again without re-uploading, until you delete them with the "Delete My Uploaded Resume" button; evaluation results stay cached for up to a week.  
     """)
 
 # Create two columns for the main layout
@@ -171,7 +307,7 @@ with col1:
     with st.form(key="job_search_form"):
         st.session_state.job_title = st.text_input("Enter Job Title:", placeholder="e.g., Data Scientist")
         st.session_state.job_location = st.text_input("Enter Job Location:", placeholder="e.g., Copenhagen")
-        st.session_state.num_results = st.number_input("Number of Results:", min_value=1, max_value=10, value=5)
+        st.session_state.num_results = st.number_input("Number of Results:", min_value=1, max_value=50, value=5)
         submit_button = st.form_submit_button(label="🔍 Search Jobs")
         
         if submit_button:
@@ -180,8 +316,11 @@ with col1:
     # Show results
     if st.session_state["job_results"]:
         st.write("### Search Results")
+        if st.button("🎯 Rank by Resume Fit"):
+            rank_job_results()
         for i, job in enumerate(st.session_state["job_results"]):
-            with st.expander(f"{i+1}. {job['Role']} at {job['Company']} ({job['Location']})"):
+            fit = f" — fit {job['FitScore']:.0%}" if "FitScore" in job else ""
+            with st.expander(f"{i+1}. {job['Role']} at {job['Company']} ({job['Location']}){fit}"):
                 st.write(f"**Role:** {job['Role']}")
                 st.write(f"**Company:** {job['Company']}")
                 st.write(f"**Location:** {job['Location']}")
@@ -217,10 +356,51 @@ with col2:
     # Resume upload
     st.session_state.resume_file = st.file_uploader("Upload Your Resume (PDF format)", type=["pdf"])
     
+    st.toggle("Stream the report as it is written", key="stream_report",
+              help="Shows the report live, but the page waits until it is finished.")
+    
     # Evaluate button
-    if st.button("Evaluate Resume"):
+    if st.button("Evaluate Resume", disabled=bool(st.session_state["evaluation_id"])):
         evaluate_resume()
     
+    if st.session_state.get("resume_ids") and st.button("🗑️ Delete My Uploaded Resume"):
+        delete_uploaded_resumes()
+    
+    # Poll a queued evaluation without re-running the rest of the page
+    @st.fragment(run_every=POLL_INTERVAL_SECONDS if st.session_state["evaluation_id"] else None)
+    def evaluation_progress():
+        evaluation_id = st.session_state["evaluation_id"]
+        if not evaluation_id:
+            return
+        try:
+            response = http.get(f"{API_EVALUATIONS_URL}/{evaluation_id}", timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            st.warning(f"Waiting for the API: {e}")
+            return
+        if response.status_code != 200:
+            st.session_state["evaluation_id"] = None
+            st.error(f"Evaluation lost: {response.status_code} - {response.text}")
+            return
+        job = response.json()
+        if job["status"] == "failed":
+            st.session_state["evaluation_id"] = None
+            st.error(f"Evaluation failed: {job['error']}")
+        elif job["status"] == "completed":
+            st.session_state["evaluation_id"] = None
+            st.session_state["evaluation_result"] = {
+                "job_requirements": job["job_requirements"],
+                "evaluation_result": job["evaluation_result"]
+            }
+            # Re-run the whole page so the finished report is rendered
+            st.rerun()
+        else:
+            st.info(EVALUATION_STATUS_TEXT.get(job["status"], job["status"]))
+            if job["job_requirements"]:
+                with st.expander("Job Requirements Analysis", expanded=False):
+                    st.markdown(job["job_requirements"])
+    
+    evaluation_progress()
+    
     # Show evaluation results if available
     if st.session_state["evaluation_result"]:
         result = st.session_state["evaluation_result"]
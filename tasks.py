@@ -1,9 +1,10 @@
 # tasks.py
 import json
-from crewai import Task
-from agents import job_searcher_agent, job_researcher, resume_evaluator
+from agents import get_agent
 
 def job_search_task(user_role, user_location, num_results=5):
+    from crewai import Task
+    job_searcher_agent = get_agent("job_searcher_agent")
     return Task(
         description=f"Find {num_results} job opportunities for '{user_role}' in '{user_location}'.",
         agent=job_searcher_agent,
@@ -13,6 +14,7 @@ def job_search_task(user_role, user_location, num_results=5):
 
 
 def jd_research_task(job_title, job_description):
+    from crewai import Task
     research_prompt = f"""
     Research the key qualifications, skills, and requirements for the position of "{job_title}" 
     with this job description:
@@ -31,21 +33,18 @@ def jd_research_task(job_title, job_description):
     
     return Task(
         description=research_prompt,
-        agent=job_researcher,
+        agent=get_agent("job_researcher"),
         expected_output="A comprehensive report on job requirements"
     )
 
-# Create evaluation task
-def evaluation_task(job_requirements, resume_text):
-    evaluation_prompt = f"""
+# Build the evaluation prompt (also used to measure prompt size without building a Task).
+# Instructions and requirements come before the resume so every evaluation
+# against the same job shares one prompt prefix the provider can cache.
+def build_evaluation_prompt(job_requirements, resume_text, skill_check=""):
+    return f"""
     You are an AI Resume Evaluator with expertise in ATS compliance, clarity, and impactful writing.
     
-    First, review these job requirements:
-    {job_requirements}
-    
-    Now, evaluate the following resume against these requirements:
-    {resume_text}
-    
+    Evaluate the resume at the end of this message against the job requirements below.
     Provide your evaluation with:
     1. **Overall Score (out of 10)**
     2. **Match Assessment** (How well does the resume match the job requirements?)
@@ -55,12 +54,139 @@ def evaluation_task(job_requirements, resume_text):
     6. **Improvement Recommendations** (Specific suggestions to better align with the job requirements)
     
     Be specific, honest, and constructive in your feedback, focusing on actionable improvements.
+    If a local skill check is included, take its matched and missing skills as given and spend
+    your effort on what it cannot see: equivalent skills, depth, seniority and impact.
+    
+    Job requirements:
+    {job_requirements}
+    
+    {skill_check}
+    
+    Resume:
+    {resume_text}
     """
+
+# Structured variant of the evaluation prompt; same prefix ordering as above
+def build_structured_evaluation_prompt(job_requirements, resume_text, skill_check=""):
+    return f"""
+    You are an AI Resume Evaluator with expertise in ATS compliance, clarity, and impactful writing.
+    
+    Evaluate the resume at the end of this message against the job requirements below.
+    Answer with a single JSON object and nothing else, with these fields:
+    - "overall_score": number from 0 to 10
+    - "match_assessment": how well the resume matches the job requirements, in 2-4 sentences
+    - "matched_skills": list of required skills the resume demonstrates
+    - "missing_skills": list of required skills the resume lacks
+    - "strengths": list of things that are well written and align with the requirements
+    - "weaknesses": list of things that need improvement or are missing
+    - "ats_tips": list of ways the resume can rank better in ATS systems
+    - "recommendations": list of specific suggestions to better align with the job requirements
     
+    Be specific, honest, and constructive, focusing on actionable improvements.
+    If a local skill check is included, start matched_skills and missing_skills from it and spend
+    your effort on what it cannot see: equivalent skills, depth, seniority and impact.
+    
+    Job requirements:
+    {job_requirements}
+    
+    {skill_check}
+    
+    Resume:
+    {resume_text}
+    """
+
+# Create evaluation task
+def evaluation_task(job_requirements, resume_text, skill_check=""):
+    from crewai import Task
+    # Validated (and repaired once if needed) by pipeline.run_structured_task;
+    # no output_pydantic, so crewai does not make conversion calls of its own
+    return Task(
+        description=build_structured_evaluation_prompt(job_requirements, resume_text, skill_check),
+        agent=get_agent("resume_evaluator"),
+        expected_output="A JSON resume evaluation report"
+    )
+
+# Prose evaluation for streaming, where the text is shown as it is generated
+def evaluation_stream_task(job_requirements, resume_text, skill_check=""):
+    from crewai import Task
     return Task(
-        description=evaluation_prompt,
-        agent=resume_evaluator,
+        description=build_evaluation_prompt(job_requirements, resume_text, skill_check),
+        agent=get_agent("resume_evaluator"),
         expected_output="A detailed resume evaluation report"
-        # context=[job_requirements]
     )
 
+# Ask the evaluator to fix an answer that did not match its output schema
+def evaluation_repair_task(previous_output, errors, output_model=None):
+    from crewai import Task
+    from reports import EvaluationReport
+    output_model = output_model or EvaluationReport
+    return Task(
+        description=f"""
+    Your previous answer could not be parsed: {errors}
+    
+    Previous answer:
+    {previous_output}
+    
+    Return the same assessment as a single valid JSON object with the fields
+    {", ".join(output_model.model_fields)}. Scores are numbers from 0 to 10. Do not add any other text.
+    """,
+        agent=get_agent("resume_evaluator"),
+        expected_output="A JSON object matching the requested fields"
+    )
+
+# Assess a single resume section; used to re-evaluate only the sections that changed
+def build_section_prompt(job_requirements, heading, section_text):
+    return f"""
+    You are an AI Resume Evaluator assessing one section of a resume at a time.
+    
+    Assess the resume section at the end of this message against the job requirements below,
+    judging only what this section contributes. Answer with a single JSON object and nothing else:
+    - "score": number from 0 to 10 for how well this section supports the application
+    - "matched_skills": list of required skills this section demonstrates
+    - "missing_skills": list of required skills this section would be expected to show but does not
+    - "strengths": list of what works well in this section
+    - "weaknesses": list of what is weak or missing in this section
+    - "recommendations": list of specific edits to this section
+    
+    Job requirements:
+    {job_requirements}
+    
+    Resume section "{heading or 'Header'}":
+    {section_text}
+    """
+
+
+def section_evaluation_task(job_requirements, heading, section_text):
+    from crewai import Task
+    return Task(
+        description=build_section_prompt(job_requirements, heading, section_text),
+        agent=get_agent("resume_evaluator"),
+        expected_output="A JSON assessment of the resume section"
+    )
+
+
+# Compact scoring prompt for the comparison matrix; same prefix ordering as above
+def build_match_prompt(job_requirements, resume_text):
+    return f"""
+    You are an AI Resume Evaluator scoring how well resumes match one job.
+    
+    Score the resume at the end of this message against the job requirements below.
+    Answer with a single JSON object and nothing else:
+    {{"score": <number from 0 to 10>, "matched": [<up to 5 requirements the resume meets>],
+      "missing": [<up to 5 requirements the resume lacks>], "summary": "<one sentence>"}}
+    
+    Job requirements:
+    {job_requirements}
+    
+    Resume:
+    {resume_text}
+    """
+
+
+def match_task(job_requirements, resume_text):
+    from crewai import Task
+    return Task(
+        description=build_match_prompt(job_requirements, resume_text),
+        agent=get_agent("resume_evaluator"),
+        expected_output="A JSON object with score, matched, missing and summary"
+    )
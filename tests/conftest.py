@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+# Module-level settings are read on import, so they are set before any test module loads
+_state_dir = tempfile.mkdtemp(prefix="career-guide-tests-")
+os.environ.setdefault("STATE_DB_PATH", os.path.join(_state_dir, "state.db"))
+os.environ.setdefault("ADZUNA_BACKOFF_SECONDS", "0.01")
+os.environ.setdefault("ADZUNA_REQUESTS_PER_MINUTE", "0")
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+
+from adzuna import AdzunaClient, AdzunaError, ADZUNA_MAX_PAGE_CONCURRENCY, _retry_delay
+from adzuna_stub import start_stub
+from backends import SQLiteBackend, SharedTTLCache
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**options):
+        server, url = start_stub(port=0, **options)
+        servers.append(server)
+        return server.RequestHandlerClass, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client_for(tmp_path):
+    """AdzunaClient on a stub URL with its own empty cache."""
+    backend = SQLiteBackend(str(tmp_path / "state.db"))
+    clients = []
+
+    def make(url, **options):
+        client = AdzunaClient(base_url=url, **options)
+        client.cache = SharedTTLCache("adzuna", 60, backend=backend)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        asyncio.run(client.aclose())
+    backend.close()
+
+
+def collect(client, *args, **kwargs):
+    async def run():
+        return [result async for result in client.iter_results(*args, **kwargs)]
+    return asyncio.run(run())
+
+
+def test_retry_delay_honours_and_caps_retry_after():
+    assert _retry_delay(0, "2", max_delay=5) == 2
+    assert _retry_delay(0, "3600", max_delay=5) == 5
+    assert _retry_delay(1, "soon", max_delay=5) == _retry_delay(1)
+    assert _retry_delay(1, "nan", max_delay=5) == _retry_delay(1)
+    assert _retry_delay(0, "-1", max_delay=5) == 0
+
+
+def test_query_is_url_encoded(stub, client_for):
+    _, url = stub()
+    client = client_for(url)
+    payload = client.search_page("c++ & rust developer", "são paulo/sp", results_per_page=2)
+    assert payload["results"][0]["title"].startswith("C++ & Rust Developer")
+    assert payload["results"][0]["location"]["display_name"] == "São Paulo/Sp"
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_failed_responses(stub, client_for, status):
+    handler, url = stub(fail_every=2, fail_status=status)
+    client = client_for(url, max_retries=2)
+    client.search_page("python", "berlin", page=1)
+    payload = client.search_page("python", "berlin", page=2)
+    assert payload["results"]
+    assert handler.request_count == 3
+
+
+def test_gives_up_after_max_retries(stub, client_for):
+    handler, url = stub(fail_every=1)
+    client = client_for(url, max_retries=2)
+    with pytest.raises(AdzunaError) as error:
+        client.search_page("python", "berlin")
+    assert error.value.status_code == 503
+    assert handler.request_count == 3
+
+
+def test_long_retry_after_is_capped(stub, client_for):
+    handler, url = stub(fail_every=2, fail_status=429, retry_after="3600")
+    client = client_for(url, max_retries=2)
+    client.search_page("python", "berlin", page=1)
+    started = time.monotonic()
+    assert client.search_page("python", "berlin", page=2)["results"]
+    assert time.monotonic() - started < client.max_retry_delay + 1
+
+
+def test_cache_key_ignores_case_and_padding(stub, client_for):
+    handler, url = stub()
+    client = client_for(url)
+    first = client.search_page("Data Engineer", "London ")
+    assert client.search_page(" data engineer", "london") == first
+    assert asyncio.run(client.search_page_async("DATA ENGINEER", "LONDON")) == first
+    assert handler.request_count == 1
+    client.search_page("data engineer", "london", page=2)
+    client.search_page("data engineer", "london", results_per_page=20)
+    assert handler.request_count == 3
+
+
+def test_iter_results_stops_at_max_results(stub, client_for):
+    handler, url = stub(total_results=1000)
+    client = client_for(url)
+    results = collect(client, "python", "berlin", 120, page_size=50)
+    assert len(results) == 120
+    assert handler.request_count == 3
+
+
+def test_iter_results_skips_duplicates_across_pages(stub, client_for):
+    _, url = stub(total_results=30)
+    client = client_for(url)
+    first_page = client.search_page("python", "berlin", page=1, results_per_page=10)
+    # Page 2 repeats half of page 1, as happens when listings shift between requests
+    repeated = {"count": 30, "results": first_page["results"][5:] + first_page["results"][:5]}
+    client.cache.set(client._cache_key("python", "berlin", 2, 10, None), repeated)
+    results = collect(client, "python", "berlin", 100, page_size=10)
+    ids = [result["id"] for result in results]
+    assert len(ids) == len(set(ids)) == 20
+
+
+def test_iter_results_clamps_concurrency(stub, client_for):
+    _, url = stub(latency=0.02, total_results=1000)
+    client = client_for(url)
+    in_flight = peak = 0
+    search_page_async = client.search_page_async
+
+    async def tracked(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await search_page_async(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    client.search_page_async = tracked
+    results = collect(client, "python", "berlin", 1000, page_size=10, concurrency=ADZUNA_MAX_PAGE_CONCURRENCY * 4)
+    assert len(results) == 1000
+    assert peak == ADZUNA_MAX_PAGE_CONCURRENCY